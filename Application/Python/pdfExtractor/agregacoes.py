@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from esquema import COLS
+
+
+# Funções de agregação do dashboard, aplicadas às linhas filtradas
+# (indice.DatasetIndexado). O dataset já tem uma linha por curso × ano × tipo,
+# então elas recebem a fatia do filtro direto, sem pré-agregação.
+
+
+def _somar(dfx: pd.DataFrame, chaves, medidas: list[str]) -> pd.DataFrame:
+    # as linhas vêm compactadas (esquema.compactar) e o groupby devolve a soma
+    # no mesmo tipo quando ela cabe (ex.: int16); o agregado é pequeno (um
+    # ponto por ano/tipo), então vai para int64 antes de qualquer conta (M + F)
+    g = dfx.groupby(chaves, as_index=False, observed=True)[medidas].sum()
+    g[medidas] = g[medidas].astype("int64")
+    return g
+
+
+def agg_por_ano(dfx: pd.DataFrame) -> pd.DataFrame:
+    g = _somar(dfx, COLS["ano"], [COLS["mat_total"]])
+    return g.rename(columns={COLS["mat_total"]: "matriculas"})
+
+
+def agg_sexo_por_ano(dfx: pd.DataFrame, percentual: bool) -> pd.DataFrame:
+    g = _somar(dfx, COLS["ano"], [COLS["mat_m"], COLS["mat_f"]])
+    g = g.rename(columns={COLS["mat_m"]: "M", COLS["mat_f"]: "F"})
+    if percentual:
+        tot = g["M"] + g["F"]
+        g["M"] = np.where(tot > 0, g["M"]/tot, 0.0)
+        g["F"] = np.where(tot > 0, g["F"]/tot, 0.0)
+    return g
+
+
+def agg_tipo_por_ano(dfx: pd.DataFrame, percentual: bool) -> pd.DataFrame:
+    g = _somar(dfx, [COLS["ano"], COLS["tipo"]], [COLS["mat_total"]])
+    g = g.rename(columns={COLS["mat_total"]: "matriculas"})
+    if percentual:
+        g["total_ano"] = g.groupby(COLS["ano"])["matriculas"].transform("sum")
+        g["matriculas"] = np.where(g["total_ano"] > 0, g["matriculas"]/g["total_ano"], 0.0)
+        g = g.drop(columns=["total_ano"])
+    return g
+
+
+def kpis(dfx: pd.DataFrame):
+    if dfx.empty:
+        return 0, None, None, {}
+    # total no filtro
+    total = int(dfx[COLS["mat_total"]].sum())
+
+    # um único groupby por ano (e um por ano × tipo) no lugar de uma
+    # varredura com == para cada ano consultado
+    por_ano = dfx.groupby(COLS["ano"])[[COLS["mat_total"], COLS["mat_m"], COLS["mat_f"]]].sum().sort_index()
+    yoy = None
+    pct_f_ultimo = None
+    part_tipo_ultimo = {}
+
+    if not por_ano.empty:
+        # ano atual = maior dentro do filtro; ano anterior
+        ano_ult = por_ano.index[-1]
+        ult = por_ano.iloc[-1]
+        total_ult = int(ult[COLS["mat_total"]])
+        if len(por_ano) >= 2:
+            total_ant = int(por_ano.iloc[-2][COLS["mat_total"]])
+            if total_ant > 0:
+                yoy = (total_ult - total_ant) / total_ant
+
+        # %F no último ano
+        fem = int(ult[COLS["mat_f"]])
+        masc = int(ult[COLS["mat_m"]])
+        denom = fem + masc
+        pct_f_ultimo = (fem / denom) if denom > 0 else None
+
+        # participação por tipo no último ano
+        g = dfx.groupby([COLS["ano"], COLS["tipo"]], observed=True)[COLS["mat_total"]].sum().xs(ano_ult, level=0)
+        tot = g.sum()
+        if tot > 0:
+            part_tipo_ultimo = {k: float(v/tot) for k, v in g.to_dict().items()}
+
+    return total, yoy, pct_f_ultimo, part_tipo_ultimo
+
+
+def metricas_derivadas(dfx: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta ocupação (matrículas / vagas) e % feminino, calculadas na hora.
+
+    Não ficam guardadas no dataset em cache: só quem exibe ou exporta as
+    linhas (ex.: os downloads) paga pelas duas colunas float.
+    """
+    vagas = dfx[COLS["vagas"]].where(dfx[COLS["vagas"]] > 0)
+    denom_sexo = dfx[COLS["mat_m"]].astype("int64") + dfx[COLS["mat_f"]]
+    return dfx.assign(
+        ocupacao=dfx[COLS["mat_total"]] / vagas,
+        pct_f=dfx[COLS["mat_f"]] / denom_sexo.where(denom_sexo > 0),
+    )
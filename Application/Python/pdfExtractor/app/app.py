@@ -1,65 +1,58 @@
 # app.py
+import os
+import sys
+from functools import partial
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
-import numpy as np
 import altair as alt
 
+# módulos compartilhados com o extrator ficam na pasta pdfExtractor
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from esquema import COLS, compactar, dataset_padrao, ler_dataset, versao_dataset  # noqa: E402
+from indice import DatasetIndexado  # noqa: E402
+from agregacoes import agg_por_ano, agg_sexo_por_ano, agg_tipo_por_ano, kpis, metricas_derivadas  # noqa: E402
+from insights import calcular_insights  # noqa: E402
+
 # =============================
 # CONFIG
 # =============================
 st.set_page_config(page_title="TCC UNESP Bauru", layout="wide")
-alt.data_transformers.disable_max_rows()
-
-ARQUIVO = "Application/Python/pdfExtractor/saida/bauru_ampla.csv"  # <- ajuste aqui
-ENCODING = "latin1"
-SEP = ";"  # ajuste se precisar
-
-COLS = {
-    "curso": "curso",
-    "ano": "ano_origem",
-    "tipo": "tipo",  # Ampla / Isentos / Convênio
-    "vagas": "vagas",
-    "vagas_rem": "vagas_remanescentes",
-    "mat_total": "matriculados_total",
-    "mat_m": "matriculados_sexo_masc",
-    "mat_f": "matriculados_sexo_fem",
-    "conv": "matrículas_chamada_conv",
-    "le": "matrículas_chamada_le",
-    "rel_ad": "matrículas_relação_adicional",
-}
+# Sem disable_max_rows: os gráficos só recebem pontos já agregados (ver
+# dados_grafico), então o limite padrão do Altair (5000 linhas) fica como
+# proteção contra mandar dados brutos para o navegador por engano.
+
+# dataset consolidado com as três categorias (esquema.dataset_padrao);
+# `python main.py serve --dataset ...` troca pela variável PDFEXTRACTOR_DATASET
+ARQUIVO = os.environ.get("PDFEXTRACTOR_DATASET") or dataset_padrao(str(Path(__file__).resolve().parents[1] / "saida"))
+# `python main.py build-parquet` grava o .parquet do dataset, usado no lugar do CSV quando em dia
 
 # =============================
 # LOAD & PREP
 # =============================
-@st.cache_data(show_spinner=False)
-def load_data(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path, encoding=ENCODING, sep=SEP)
-    # tipagem
-    for c in [COLS["ano"]]:
-        df[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
-    for c in [
-        COLS["vagas"], COLS["vagas_rem"], COLS["mat_total"],
-        COLS["mat_m"], COLS["mat_f"], COLS["conv"], COLS["le"], COLS["rel_ad"]
-    ]:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(int)
-
-    # limpeza básica
-    for c in [COLS["curso"], COLS["tipo"]]:
-        df[c] = df[c].astype(str).str.strip()
-
-    # derivadas úteis
-    df["ocupacao"] = np.where(
-        (df[COLS["vagas"]].fillna(0) > 0),
-        df[COLS["mat_total"]] / df[COLS["vagas"]].replace(0, np.nan),
-        np.nan,
-    )
-    denom_sexo = (df[COLS["mat_m"]].fillna(0) + df[COLS["mat_f"]].fillna(0))
-    df["pct_f"] = np.where(denom_sexo > 0, df[COLS["mat_f"]] / denom_sexo, np.nan)
-
-    return df
-
-df = load_data(ARQUIVO)
+# O loader recebe também a versão do dataset (mtime dos arquivos, ver
+# esquema.versao_dataset): quando o extrator ou o build-parquet republicam os
+# arquivos, a chave muda e a próxima execução do script já lê os dados novos,
+# sem reiniciar o servidor. max_entries=2 descarta as versões antigas.
+#
+# O dataset já tem uma linha por curso × ano × tipo (validacao.validar barra
+# as duplicadas), então não há o que pré-agregar: todas as abas filtram as
+# próprias linhas pelos índices (ano ordenado, códigos de curso/tipo,
+# posições por chave). cache_resource: um objeto só, compartilhado e somente
+# leitura, sem cópia por sessão; é a única cópia das linhas em memória.
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_index(path: str, versao: float) -> DatasetIndexado:
+    # Nada de to_numeric/strip aqui: o Parquet já vem tipado (e as saídas do
+    # extrator, normalizadas por normalizacao.py); CSV solto passa uma vez
+    # por esquema.tipar_dataset, que conserta encoding e converte em bloco.
+    # compactar deixa texto categórico e contagens no menor inteiro seguro.
+    # Ocupação e % feminino não são guardadas (ver metricas_derivadas).
+    return DatasetIndexado(compactar(ler_dataset(path)))
+
+# (caminho, versão): é o que as funções com cache por filtro recebem
+FONTE = (ARQUIVO, versao_dataset(ARQUIVO))
+df = load_index(*FONTE).df
 
 # =============================
 # SIDEBAR (FILTROS)
@@ -77,75 +70,89 @@ curso_sel = st.sidebar.multiselect("Curso(s)", options=cursos, default=cursos)
 tipo_sel = st.sidebar.multiselect("Tipo de convocação", options=tipos, default=tipos)
 modo = st.sidebar.radio("Modo de exibição", ["Absoluto", "Percentual"], index=0)
 
-# aplica filtros
-df_f = df[
-    df[COLS["ano"]].between(ano_sel[0], ano_sel[1])
-    & df[COLS["curso"]].isin(curso_sel)
-    & df[COLS["tipo"]].isin(tipo_sel)
-].copy()
-
 # =============================
-# FUNÇÕES DE AGREGAÇÃO
+# CACHE POR FILTRO
 # =============================
-def agg_por_ano(dfx: pd.DataFrame) -> pd.DataFrame:
-    g = dfx.groupby(COLS["ano"], as_index=False)[COLS["mat_total"]].sum()
-    return g.rename(columns={COLS["mat_total"]: "matriculas"})
-
-def agg_sexo_por_ano(dfx: pd.DataFrame, percentual: bool) -> pd.DataFrame:
-    g = dfx.groupby(COLS["ano"], as_index=False)[[COLS["mat_m"], COLS["mat_f"]]].sum()
-    g = g.rename(columns={COLS["mat_m"]: "M", COLS["mat_f"]: "F"})
-    if percentual:
-        tot = g["M"] + g["F"]
-        g["M"] = np.where(tot > 0, g["M"]/tot, 0.0)
-        g["F"] = np.where(tot > 0, g["F"]/tot, 0.0)
-    return g
-
-def agg_tipo_por_ano(dfx: pd.DataFrame, percentual: bool) -> pd.DataFrame:
-    g = dfx.groupby([COLS["ano"], COLS["tipo"]], as_index=False)[COLS["mat_total"]].sum()
-    g = g.rename(columns={COLS["mat_total"]: "matriculas"})
-    if percentual:
-        g["total_ano"] = g.groupby(COLS["ano"])["matriculas"].transform("sum")
-        g["matriculas"] = np.where(g["total_ano"] > 0, g["matriculas"]/g["total_ano"], 0.0)
-        g = g.drop(columns=["total_ano"])
-    return g
-
-def kpis(dfx: pd.DataFrame):
-    if dfx.empty:
-        return 0, None, None, {}
-    # total no filtro
-    total = int(dfx[COLS["mat_total"]].sum())
-
-    # ano atual = maior dentro do filtro; ano anterior
-    anos_loc = sorted(dfx[COLS["ano"]].dropna().unique())
-    yoy = None
-    pct_f_ultimo = None
-    part_tipo_ultimo = {}
-
-    if anos_loc:
-        ano_ult = anos_loc[-1]
-        ano_ant = anos_loc[-2] if len(anos_loc) >= 2 else None
-
-        df_ult = dfx[dfx[COLS["ano"]] == ano_ult]
-        total_ult = int(df_ult[COLS["mat_total"]].sum())
-        if ano_ant is not None:
-            df_ant = dfx[dfx[COLS["ano"]] == ano_ant]
-            total_ant = int(df_ant[COLS["mat_total"]].sum())
-            if total_ant > 0:
-                yoy = (total_ult - total_ant) / total_ant
-
-        # %F no último ano
-        fem = int(df_ult[COLS["mat_f"]].sum())
-        masc = int(df_ult[COLS["mat_m"]].sum())
-        denom = fem + masc
-        pct_f_ultimo = (fem / denom) if denom > 0 else None
-
-        # participação por tipo no último ano
-        g = df_ult.groupby(COLS["tipo"])[COLS["mat_total"]].sum()
-        tot = g.sum()
-        if tot > 0:
-            part_tipo_ultimo = {k: float(v/tot) for k, v in g.to_dict().items()}
-
-    return total, yoy, pct_f_ultimo, part_tipo_ultimo
+# Cada combinação de filtros vira uma chave normalizada (listas ordenadas
+# viram tuplas, então a ordem de seleção no multiselect não importa). O
+# st.cache_data é compartilhado entre as sessões e, com max_entries, descarta
+# as combinações menos usadas quando passa do limite.
+MAX_FILTROS_EM_CACHE = 64
+
+def chave_filtro(ano_sel, curso_sel, tipo_sel) -> tuple:
+    return (int(ano_sel[0]), int(ano_sel[1])), tuple(sorted(curso_sel)), tuple(sorted(tipo_sel))
+
+@st.cache_data(show_spinner=False, max_entries=MAX_FILTROS_EM_CACHE)
+def linhas_filtradas(fonte: tuple, filtro: tuple) -> pd.DataFrame:
+    idx = load_index(*fonte)
+    return idx.linhas(idx.filtrar(*filtro))
+
+@st.cache_data(show_spinner=False, max_entries=MAX_FILTROS_EM_CACHE)
+def agregados_filtro(fonte: tuple, filtro: tuple) -> dict:
+    linhas_f = linhas_filtradas(fonte, filtro)
+    return {
+        "kpis": kpis(linhas_f),
+        "por_ano": agg_por_ano(linhas_f),
+        "cursos": sorted(linhas_f[COLS["curso"]].unique().tolist()),
+    }
+
+@st.cache_data(show_spinner=False, max_entries=MAX_FILTROS_EM_CACHE)
+def agregados_modo(fonte: tuple, filtro: tuple, percentual: bool) -> dict:
+    linhas_f = linhas_filtradas(fonte, filtro)
+    ultimo = None
+    if not linhas_f.empty:
+        ano_last = linhas_f[COLS["ano"]].max()
+        ultimo = (ano_last, agg_tipo_por_ano(linhas_f[linhas_f[COLS["ano"]] == ano_last], percentual=percentual))
+    return {
+        "tipo_ultimo_ano": ultimo,
+        "sexo_por_ano": agg_sexo_por_ano(linhas_f, percentual=percentual),
+        "tipo_por_ano": agg_tipo_por_ano(linhas_f, percentual=percentual),
+    }
+
+@st.cache_data(show_spinner=False, max_entries=MAX_FILTROS_EM_CACHE)
+def drilldown_curso(fonte: tuple, filtro: tuple, curso: str) -> dict:
+    idx = load_index(*fonte)
+    pos_c = idx.do_curso(idx.filtrar(*filtro), curso)
+    df_c = idx.linhas(pos_c)
+    g_c = df_c.groupby(COLS["ano"], as_index=False)[COLS["mat_total"]].sum().rename(columns={COLS["mat_total"]: "matriculas"})
+    ano_last = df_c[COLS["ano"]].max()
+    df_c_last = idx.linhas(idx.do_ano(pos_c, ano_last))
+    gsex = df_c_last.agg({COLS["mat_m"]:"sum", COLS["mat_f"]:"sum"}).rename({COLS["mat_m"]:"M", COLS["mat_f"]:"F"}).reset_index()
+    gsex.columns = ["sexo", "valor"]
+    gtipo = df_c_last.groupby(COLS["tipo"], as_index=False, observed=True)[COLS["mat_total"]].sum().rename(columns={COLS["mat_total"]:"matriculas"})
+    return {"historico": g_c, "ano_last": ano_last, "sexo": gsex, "tipo": gtipo}
+
+@st.cache_data(show_spinner=False, max_entries=MAX_FILTROS_EM_CACHE)
+def insights_filtro(fonte: tuple, filtro: tuple) -> dict | None:
+    return calcular_insights(linhas_filtradas(fonte, filtro))
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def csv_download(fonte: tuple, filtro: tuple, curso: str | None = None) -> bytes:
+    linhas_f = linhas_filtradas(fonte, filtro)
+    if curso is not None:
+        linhas_f = linhas_f[linhas_f[COLS["curso"]] == curso]
+    return metricas_derivadas(linhas_f).to_csv(index=False).encode("utf-8")
+
+def botao_download(rotulo: str, file_name: str, chave: str, curso: str | None = None):
+    # data como função: o CSV só é montado no clique, não a cada rerun, e
+    # on_click="ignore" baixa sem rodar o script de novo
+    st.download_button(
+        rotulo,
+        data=partial(csv_download, FONTE, filtro, curso),
+        file_name=file_name,
+        mime="text/csv",
+        key=f"baixar_{chave}",
+        on_click="ignore",
+    )
+
+def dados_grafico(dfx: pd.DataFrame, *colunas: str) -> pd.DataFrame:
+    # só as colunas codificadas no gráfico vão para o spec do Vega-Lite
+    return dfx[list(colunas)]
+
+filtro = chave_filtro(ano_sel, curso_sel, tipo_sel)
+percentual = modo == "Percentual"
+base_f = agregados_filtro(FONTE, filtro)
+modo_f = agregados_modo(FONTE, filtro, percentual)
 
 # =============================
 # CABEÇALHO + KPIs
@@ -153,7 +160,7 @@ def kpis(dfx: pd.DataFrame):
 st.title("Análise dos Dados do Vestibular — UNESP Bauru")
 
 col_a, col_b, col_c, col_d = st.columns(4)
-total, yoy, pctf, part_tipo = kpis(df_f)
+total, yoy, pctf, part_tipo = base_f["kpis"]
 col_a.metric("Total de matrículas (filtro)", f"{total:,}".replace(",", "."))
 
 if yoy is None:
@@ -180,13 +187,13 @@ tab1, tab2, tab3, tab4, tab5 = st.tabs([
 
 # ---- Visão Geral ----
 with tab1:
-    g1 = agg_por_ano(df_f)
+    g1 = base_f["por_ano"]
     st.subheader("Matrículas por ano")
     if g1.empty:
         st.info("Sem dados para os filtros selecionados.")
     else:
         chart1 = (
-            alt.Chart(g1)
+            alt.Chart(dados_grafico(g1, COLS["ano"], "matriculas"))
             .mark_line(point=True)
             .encode(
                 x=alt.X("ano_origem:O", title="Ano"),
@@ -198,15 +205,13 @@ with tab1:
         st.altair_chart(chart1, use_container_width=True)
 
     st.subheader("Composição por tipo (último ano selecionado)")
-    if not df_f.empty:
-        ano_last = df_f[COLS["ano"]].max()
-        df_last = df_f[df_f[COLS["ano"]] == ano_last]
-        g_last = agg_tipo_por_ano(df_last, percentual=(modo == "Percentual"))
+    if modo_f["tipo_ultimo_ano"] is not None:
+        ano_last, g_last = modo_f["tipo_ultimo_ano"]
         if g_last.empty:
             st.info("Sem dados para o último ano.")
         else:
             chart2 = (
-                alt.Chart(g_last)
+                alt.Chart(dados_grafico(g_last, COLS["tipo"], "matriculas"))
                 .mark_bar()
                 .encode(
                     x=alt.X("tipo:N", title="Tipo de convocação"),
@@ -220,23 +225,18 @@ with tab1:
     st.subheader("Resumo por ano")
     st.dataframe(g1.sort_values("ano_origem"))
 
-    st.download_button(
-        "Baixar dados filtrados (CSV)",
-        data=df_f.to_csv(index=False).encode("utf-8"),
-        file_name="dados_filtrados.csv",
-        mime="text/csv",
-    )
+    botao_download("Baixar dados filtrados (CSV)", "dados_filtrados.csv", "filtrados")
 
 # ---- Por Sexo ----
 with tab2:
     st.subheader("Matrículas por sexo por ano")
-    g2 = agg_sexo_por_ano(df_f, percentual=(modo == "Percentual"))
+    g2 = modo_f["sexo_por_ano"]
     if g2.empty:
         st.info("Sem dados para os filtros selecionados.")
     else:
         g2m = g2.melt(id_vars=[COLS["ano"]], value_vars=["M", "F"], var_name="sexo", value_name="valor")
         chart = (
-            alt.Chart(g2m)
+            alt.Chart(dados_grafico(g2m, COLS["ano"], "sexo", "valor"))
             .mark_bar()
             .encode(
                 x=alt.X("ano_origem:O", title="Ano"),
@@ -261,12 +261,12 @@ with tab2:
 # ---- Por Tipo ----
 with tab3:
     st.subheader("Matrículas por tipo de convocação por ano")
-    g3 = agg_tipo_por_ano(df_f, percentual=(modo == "Percentual"))
+    g3 = modo_f["tipo_por_ano"]
     if g3.empty:
         st.info("Sem dados para os filtros selecionados.")
     else:
         chart = (
-            alt.Chart(g3)
+            alt.Chart(dados_grafico(g3, COLS["ano"], COLS["tipo"], "matriculas"))
             .mark_bar()
             .encode(
                 x=alt.X("ano_origem:O", title="Ano"),
@@ -287,16 +287,16 @@ with tab3:
 # ---- Drilldown por Curso ----
 with tab4:
     st.subheader("Drilldown por curso")
-    cursos_disp = sorted(df_f[COLS["curso"]].unique().tolist())
+    cursos_disp = base_f["cursos"]
     curso_unique = st.selectbox("Selecione um curso", options=cursos_disp) if cursos_disp else None
     if curso_unique is None:
         st.info("Sem cursos disponíveis no filtro atual.")
     else:
-        df_c = df_f[df_f[COLS["curso"]] == curso_unique]
+        drill = drilldown_curso(FONTE, filtro, curso_unique)
         # linha histórica do curso
-        g_c = df_c.groupby(COLS["ano"], as_index=False)[COLS["mat_total"]].sum().rename(columns={COLS["mat_total"]: "matriculas"})
+        g_c = drill["historico"]
         chart_c = (
-            alt.Chart(g_c)
+            alt.Chart(dados_grafico(g_c, COLS["ano"], "matriculas"))
             .mark_line(point=True)
             .encode(x=alt.X("ano_origem:O", title="Ano"), y=alt.Y("matriculas:Q", title="Matrículas"), tooltip=["ano_origem", "matriculas"])
             .properties(height=320)
@@ -304,53 +304,43 @@ with tab4:
         st.altair_chart(chart_c, use_container_width=True)
 
         # barras por sexo e por tipo no último ano
-        ano_last = df_c[COLS["ano"]].max()
-        df_c_last = df_c[df_c[COLS["ano"]] == ano_last]
+        ano_last = drill["ano_last"]
 
         col1, col2 = st.columns(2)
         with col1:
             st.caption(f"Por sexo — {ano_last}")
-            gsex = df_c_last.agg({COLS["mat_m"]:"sum", COLS["mat_f"]:"sum"}).rename({COLS["mat_m"]:"M", COLS["mat_f"]:"F"}).reset_index()
-            gsex.columns = ["sexo", "valor"]
+            gsex = drill["sexo"]
             chart_sex = alt.Chart(gsex).mark_bar().encode(x="sexo:N", y="valor:Q", tooltip=["sexo","valor"])
             st.altair_chart(chart_sex, use_container_width=True)
 
         with col2:
             st.caption(f"Por tipo — {ano_last}")
-            gtipo = df_c_last.groupby(COLS["tipo"], as_index=False)[COLS["mat_total"]].sum().rename(columns={COLS["mat_total"]:"matriculas"})
-            chart_tipo = alt.Chart(gtipo).mark_bar().encode(x="tipo:N", y="matriculas:Q", tooltip=["tipo","matriculas"])
+            gtipo = drill["tipo"]
+            chart_tipo = alt.Chart(dados_grafico(gtipo, COLS["tipo"], "matriculas")).mark_bar().encode(x="tipo:N", y="matriculas:Q", tooltip=["tipo","matriculas"])
             st.altair_chart(chart_tipo, use_container_width=True)
 
-        st.download_button(
+        botao_download(
             f"Baixar dados do curso ({curso_unique})",
-            data=df_c.to_csv(index=False).encode("utf-8"),
-            file_name=f"dados_{curso_unique.replace(' ','_')}.csv",
-            mime="text/csv",
+            f"dados_{curso_unique.replace(' ','_')}.csv",
+            "curso",
+            curso=curso_unique,
         )
 
 # ---- Insights ----
 with tab5:
     st.subheader("Insights automáticos")
 
-    # Crescimento por curso (período filtrado)
-    if df_f.empty:
+    ins = insights_filtro(FONTE, filtro)
+    if ins is None:
         st.info("Sem dados para os filtros selecionados.")
+    elif ins["first_year"] == ins["last_year"]:
+        # todos os insights comparam o primeiro com o último ano (com um ano
+        # só, a tabela de participação teria duas colunas "Part. <ano> (%)")
+        st.info(f"Os insights comparam anos: o filtro atual só tem dados de {ins['first_year']}. "
+                "Selecione um intervalo com dois ou mais anos.")
     else:
-        g_curso_ano = (
-            df_f.groupby([COLS["curso"], COLS["ano"]], as_index=False)[COLS["mat_total"]].sum()
-            .rename(columns={COLS["mat_total"]:"mat"})
-        )
-        # calcula variação do primeiro para o último ano por curso
-        first_year = g_curso_ano[COLS["ano"]].min()
-        last_year = g_curso_ano[COLS["ano"]].max()
-        base = g_curso_ano[g_curso_ano[COLS["ano"]] == first_year][[COLS["curso"], "mat"]].rename(columns={"mat":"mat_first"})
-        last = g_curso_ano[g_curso_ano[COLS["ano"]] == last_year][[COLS["curso"], "mat"]].rename(columns={"mat":"mat_last"})
-        comp = pd.merge(base, last, on=COLS["curso"], how="inner")
-        comp["delta_abs"] = comp["mat_last"] - comp["mat_first"]
-        comp["delta_pct"] = np.where(comp["mat_first"]>0, comp["delta_abs"]/comp["mat_first"], np.nan)
-
-        top_up = comp.sort_values(["delta_abs", "delta_pct"], ascending=[False, False]).head(3)
-        top_down = comp.sort_values(["delta_abs", "delta_pct"], ascending=[True, True]).head(3)
+        first_year, last_year = ins["first_year"], ins["last_year"]
+        top_up, top_down = ins["top_up"], ins["top_down"]
 
         c1, c2 = st.columns(2)
         with c1:
@@ -374,22 +364,7 @@ with tab5:
                     ]]
                 )
 
-        # Participação de tipos: primeiro vs. último ano
-        g_tipo = (
-            df_f.groupby([COLS["ano"], COLS["tipo"]], as_index=False)[COLS["mat_total"]].sum()
-            .rename(columns={COLS["mat_total"]: "mat"})
-        )
-        def part_por_ano(d):
-            tot = d["mat"].sum()
-            d = d.copy()
-            d["part"] = np.where(tot>0, d["mat"]/tot, np.nan)
-            return d
-        g_tipo = g_tipo.groupby(COLS["ano"], group_keys=False).apply(part_por_ano)
-
-        first_part = g_tipo[g_tipo[COLS["ano"]] == first_year][[COLS["tipo"], "part"]].rename(columns={"part":"part_first"})
-        last_part = g_tipo[g_tipo[COLS["ano"]] == last_year][[COLS["tipo"], "part"]].rename(columns={"part":"part_last"})
-        comp_part = pd.merge(first_part, last_part, on=COLS["tipo"], how="outer")
-        comp_part["delta_pp"] = (comp_part["part_last"] - comp_part["part_first"]) * 100
+        comp_part = ins["comp_part"]
 
         st.caption(f"Mudança de participação por tipo ({first_year} → {last_year}) — pontos percentuais")
         if comp_part.empty:
@@ -410,6 +385,41 @@ with tab5:
                 "delta_pp": "Δ pp"
             }))
 
+        c3, c4 = st.columns(2)
+        with c3:
+            st.caption("Crescimento anual composto (CAGR) por curso — primeiro ao último ano com dados")
+            cagr = ins["cagr"].dropna(subset=["cagr"])
+            if cagr.empty:
+                st.write("—")
+            else:
+                st.dataframe(
+                    cagr.assign(
+                        cagr=lambda d: (d["cagr"]*100).round(1),
+                        yoy_movel=lambda d: (d["yoy_movel"]*100).round(1),
+                        ano_inicio=lambda d: d["ano_inicio"].astype(int),
+                        ano_fim=lambda d: d["ano_fim"].astype(int),
+                    ).rename(columns={
+                        COLS["curso"]: "Curso", "ano_inicio": "De", "ano_fim": "Até",
+                        "mat_inicio": "Mat. início", "mat_fim": "Mat. fim",
+                        "cagr": "CAGR (%)", "yoy_movel": "YoY médio 3 anos (%)",
+                    }),
+                    hide_index=True,
+                )
+        with c4:
+            st.caption(f"Mudança de posição no ranking de matrículas ({first_year} → {last_year})")
+            ranking = ins["ranking"]
+            if ranking.empty:
+                st.write("—")
+            else:
+                st.dataframe(
+                    ranking.rename(columns={
+                        COLS["curso"]: "Curso", "pos_inicio": "Posição inicial", "pos_fim": "Posição final",
+                        "subiu": "Posições ganhas", "melhor_pos": "Melhor", "pior_pos": "Pior",
+                        "anos_com_dados": "Anos",
+                    }),
+                    hide_index=True,
+                )
+
 # =============================
 # RODAPÉ
 # =============================
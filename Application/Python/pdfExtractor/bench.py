@@ -0,0 +1,190 @@
+"""Benchmark sem interface das etapas do projeto.
+
+Mede tempo de parede, pico de memória (tracemalloc) e linhas/s de:
+- extração dos PDFs de pdfs/ (extrair_bauru_em_csvs, sem cache);
+- limpeza dos CSVs de extracts/ (cleaning.limpar_extracts);
+- índice e agregações do dashboard (agg_*, kpis e Insights) sobre datasets
+  sintéticos 10×–1000× maiores que o consolidado em saida/.
+
+Tudo é gravado em pastas temporárias; o resultado sai em JSON (stdout ou
+--saida), para comparar execuções e pegar regressões conforme os dados
+crescem. Ex.:
+
+    python bench.py --escalas 10 100 1000 --saida bench.json
+    python bench.py --sem-extracao        # pula o camelot, que é a etapa lenta
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from agregacoes import agg_por_ano, agg_sexo_por_ano, agg_tipo_por_ano, kpis
+from esquema import COLS, COLUNAS_CONTAGEM, compactar, dataset_padrao, ler_dataset
+from indice import DatasetIndexado
+from insights import calcular_insights
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+PASTA_PDF = os.path.join(PASTA, "pdfs")
+PASTA_EXTRACTS = os.path.join(PASTA, "extracts")
+DATASET_BASE = dataset_padrao(os.path.join(PASTA, "saida"))
+
+
+# tracemalloc deixa o código Python bem mais lento (a extração chega a
+# dobrar); com --sem-memoria os tempos saem limpos e o pico fica None
+MEDIR_MEMORIA = True
+
+
+def medir(nome: str, funcao, linhas=None, **extras) -> dict:
+    """Roda funcao() uma vez e devolve tempo, pico de memória e linhas/s.
+
+    linhas pode ser um número ou uma função que recebe o retorno de funcao
+    (para etapas em que o volume só é conhecido no final). O que a etapa
+    imprime é descartado para não misturar com o JSON.
+    """
+    if MEDIR_MEMORIA:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        retorno = funcao()
+    segundos = time.perf_counter() - inicio
+    pico = None
+    if MEDIR_MEMORIA:
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    n = linhas(retorno) if callable(linhas) else linhas
+    return {
+        "etapa": nome,
+        **extras,
+        "segundos": round(segundos, 6),
+        "pico_memoria_mb": round(pico / 2**20, 3) if pico is not None else None,
+        "linhas": n,
+        "linhas_por_s": round(n / segundos, 1) if n is not None and segundos > 0 else None,
+    }
+
+
+def _contar_linhas_csv_simples(caminho: str) -> int:
+    return len(pd.read_csv(caminho, dtype=str, usecols=[0])) if os.path.exists(caminho) else 0
+
+
+def _contar_linhas_extraidas(pasta: str) -> int:
+    # só as três saídas por categoria: bauru.csv repete as mesmas linhas e
+    # _quarentena.csv tem as que ficaram de fora
+    return sum(_contar_linhas_csv_simples(os.path.join(pasta, f"bauru_{categoria}.csv"))
+               for categoria in ("ampla", "se", "isento"))
+
+
+def bench_extracao(workers: int) -> dict:
+    from extractor import extrair_bauru_em_csvs
+
+    with tempfile.TemporaryDirectory() as saida:
+        r = medir("extracao", lambda: extrair_bauru_em_csvs(PASTA_PDF, pasta_saida=saida, workers=workers),
+                  workers=workers, pdfs=len([a for a in os.listdir(PASTA_PDF) if a.endswith(".pdf")]))
+        r["linhas"] = _contar_linhas_extraidas(saida)
+        r["linhas_por_s"] = round(r["linhas"] / r["segundos"], 1) if r["segundos"] > 0 else None
+    if workers > 1:
+        # tracemalloc só enxerga o processo principal
+        r["obs"] = "pico de memória não inclui os processos do pool"
+    return r
+
+
+def bench_limpeza() -> dict:
+    from cleaning import limpar_extracts
+
+    arquivos = [os.path.join(PASTA_EXTRACTS, a) for a in os.listdir(PASTA_EXTRACTS) if a.endswith(".csv")]
+    # vazão sobre as linhas lidas: a limpeza descarta boa parte delas
+    lidas = sum(len(pd.read_csv(a, dtype=str, usecols=[0])) for a in arquivos)
+    with tempfile.TemporaryDirectory() as saida:
+        r = medir("limpeza", lambda: limpar_extracts(PASTA_EXTRACTS, os.path.join(saida, "limpo.csv")),
+                  linhas=lidas, arquivos=len(arquivos))
+        r["linhas_gravadas"] = _contar_linhas_csv_simples(os.path.join(saida, "limpo.csv"))
+    return r
+
+
+def dataset_sintetico(base: pd.DataFrame, escala: int, semente: int = 0) -> pd.DataFrame:
+    """Replica o dataset `escala` vezes; cada cópia vira um conjunto novo de cursos.
+
+    Assim o sintético mantém uma linha por curso × ano × tipo, como o
+    dataset real. As contagens recebem um ruído de ±20% para os grupos não
+    ficarem idênticos. Curso e tipo continuam categóricos, como em ler_dataset.
+    """
+    rng = np.random.default_rng(semente)
+    copias = np.repeat(np.arange(escala), len(base))
+    df = base.iloc[np.tile(np.arange(len(base)), escala)].reset_index(drop=True)
+
+    cursos = df[COLS["curso"]].astype(str).to_numpy()
+    df[COLS["curso"]] = pd.Categorical(np.char.add(cursos.astype("U"), np.char.add(" #", copias.astype("U"))))
+    fator = rng.uniform(0.8, 1.2, size=len(df))
+    for c in COLUNAS_CONTAGEM:
+        if c in df.columns:
+            df[c] = np.rint(df[c].to_numpy(dtype="float64") * fator).astype(int)
+    return df
+
+
+def bench_agregacoes(base: pd.DataFrame, escala: int) -> list[dict]:
+    # como no app: linhas compactadas, indexadas uma vez e agregadas direto
+    df = compactar(dataset_sintetico(base, escala))
+    n = len(df)
+    return [
+        medir("indice", lambda: DatasetIndexado(df), linhas=n, escala=escala),
+        medir("agg_por_ano", lambda: agg_por_ano(df), linhas=n, escala=escala),
+        medir("agg_sexo_por_ano", lambda: agg_sexo_por_ano(df, True), linhas=n, escala=escala),
+        medir("agg_tipo_por_ano", lambda: agg_tipo_por_ano(df, True), linhas=n, escala=escala),
+        medir("kpis", lambda: kpis(df), linhas=n, escala=escala),
+        medir("insights", lambda: calcular_insights(df), linhas=n, escala=escala),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do extrator, da limpeza e do dashboard.")
+    parser.add_argument("--escalas", type=int, nargs="+", default=[10, 100, 1000],
+                        help="multiplicadores do dataset sintético (padrão: 10 100 1000)")
+    parser.add_argument("--workers", type=int, default=1, help="processos da extração (padrão: 1)")
+    parser.add_argument("--sem-extracao", action="store_true", help="não roda a extração dos PDFs")
+    parser.add_argument("--sem-limpeza", action="store_true", help="não roda a limpeza dos extracts")
+    parser.add_argument("--sem-memoria", action="store_true", help="não usa tracemalloc (tempos sem overhead)")
+    parser.add_argument("--dataset", default=DATASET_BASE, help="dataset consolidado usado como base sintética")
+    parser.add_argument("--saida", help="arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    global MEDIR_MEMORIA
+    MEDIR_MEMORIA = not args.sem_memoria
+
+    etapas = []
+    if not args.sem_extracao:
+        etapas.append(bench_extracao(args.workers))
+    if not args.sem_limpeza:
+        etapas.append(bench_limpeza())
+
+    base = ler_dataset(args.dataset)
+    for escala in args.escalas:
+        etapas += bench_agregacoes(base, escala)
+
+    relatorio = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "linhas_base": len(base),
+        "etapas": etapas,
+    }
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
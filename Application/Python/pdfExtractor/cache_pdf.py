@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from esquema import gravacao_atomica
+
+
+class CacheTabelas:
+    """Cache em disco das tabelas que o camelot extrai de cada PDF.
+
+    A chave combina o hash do conteúdo do PDF, os parâmetros passados ao
+    camelot e a versão do extrator. Renomear ou mover o arquivo não invalida
+    nada; mudar o conteúdo, o flavor ou a versão gera uma chave nova.
+    Cada entrada é um pickle com a lista de DataFrames (um por tabela).
+    """
+
+    def __init__(self, pasta: str = "./.cache_extracao", max_entradas: int | None = None,
+                 max_bytes: int | None = None):
+        self.pasta = pasta
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.acertos = 0
+        self.faltas = 0
+        self.gravacoes = 0
+        self.removidas = 0
+        os.makedirs(self.pasta, exist_ok=True)
+
+    # -----------------------------
+    # chaves
+    # -----------------------------
+    @staticmethod
+    def hash_arquivo(caminho: str) -> str:
+        h = hashlib.sha256()
+        with open(caminho, "rb") as f:
+            for bloco in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloco)
+        return h.hexdigest()
+
+    def chave(self, caminho: str, versao: str, **params) -> str:
+        descricao = json.dumps({"versao": versao, "params": params}, sort_keys=True, default=str)
+        sufixo = hashlib.sha256(descricao.encode("utf-8")).hexdigest()[:16]
+        return f"{self.hash_arquivo(caminho)}-{sufixo}"
+
+    def _caminho(self, chave: str) -> str:
+        return os.path.join(self.pasta, f"{chave}.pkl")
+
+    # -----------------------------
+    # leitura / escrita
+    # -----------------------------
+    def obter(self, chave: str) -> list[pd.DataFrame] | None:
+        caminho = self._caminho(chave)
+        if not os.path.exists(caminho):
+            self.faltas += 1
+            return None
+        try:
+            tabelas = pd.read_pickle(caminho)
+        except Exception:
+            # entrada corrompida (ex.: execução interrompida): trata como falta
+            self.invalidar(chave)
+            self.faltas += 1
+            return None
+        # atualiza o mtime para a política LRU de despejo
+        os.utime(caminho)
+        self.acertos += 1
+        return tabelas
+
+    def guardar(self, chave: str, tabelas: list[pd.DataFrame]) -> None:
+        caminho = self._caminho(chave)
+        with gravacao_atomica(caminho) as temporario:
+            pd.to_pickle(tabelas, temporario)
+        self.gravacoes += 1
+        self.despejar()
+
+    # -----------------------------
+    # invalidação / despejo
+    # -----------------------------
+    def _entradas(self) -> list[os.DirEntry]:
+        return [e for e in os.scandir(self.pasta) if e.is_file() and e.name.endswith(".pkl")]
+
+    def invalidar(self, chave: str) -> bool:
+        try:
+            os.remove(self._caminho(chave))
+        except FileNotFoundError:
+            return False
+        self.removidas += 1
+        return True
+
+    def invalidar_arquivo(self, caminho_pdf: str) -> int:
+        """Remove todas as entradas de um PDF, com quaisquer parâmetros."""
+        prefixo = self.hash_arquivo(caminho_pdf) + "-"
+        total = 0
+        for e in self._entradas():
+            if e.name.startswith(prefixo):
+                total += self.invalidar(e.name[:-len(".pkl")])
+        return total
+
+    def limpar(self) -> int:
+        total = 0
+        for e in self._entradas():
+            total += self.invalidar(e.name[:-len(".pkl")])
+        return total
+
+    def despejar(self) -> int:
+        """Aplica max_entradas/max_bytes removendo as entradas menos usadas."""
+        if self.max_entradas is None and self.max_bytes is None:
+            return 0
+        entradas = sorted(self._entradas(), key=lambda e: e.stat().st_mtime)
+        tamanho = sum(e.stat().st_size for e in entradas)
+        total = 0
+        while entradas and (
+            (self.max_entradas is not None and len(entradas) > self.max_entradas)
+            or (self.max_bytes is not None and tamanho > self.max_bytes)
+        ):
+            e = entradas.pop(0)
+            tamanho -= e.stat().st_size
+            total += self.invalidar(e.name[:-len(".pkl")])
+        return total
+
+    # -----------------------------
+    # estatísticas
+    # -----------------------------
+    def estatisticas(self) -> dict:
+        entradas = self._entradas()
+        return {
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "gravacoes": self.gravacoes,
+            "removidas": self.removidas,
+            "entradas": len(entradas),
+            "bytes": sum(e.stat().st_size for e in entradas),
+        }
+
+    def relatorio(self) -> str:
+        s = self.estatisticas()
+        consultas = s["acertos"] + s["faltas"]
+        taxa = (s["acertos"] / consultas * 100) if consultas else 0.0
+        return (
+            f"Cache: {s['acertos']} acertos, {s['faltas']} faltas ({taxa:.0f}% de acerto), "
+            f"{s['gravacoes']} gravações, {s['removidas']} removidas | "
+            f"{s['entradas']} entradas, {s['bytes'] / 1024:.0f} KiB"
+        )
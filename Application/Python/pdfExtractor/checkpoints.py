@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+import traceback
+from datetime import datetime
+
+import pandas as pd
+
+from cache_pdf import CacheTabelas
+from esquema import gravacao_atomica
+
+
+class Checkpoints:
+    """Resultado de cada PDF já concluído numa execução, para retomá-la após uma queda.
+
+    Cada PDF vira um pickle em pasta com o resultado e uma assinatura (hash
+    do conteúdo, versão do extrator e parâmetros). obter() só devolve o
+    checkpoint se a assinatura bater: PDF alterado, outra versão ou outros
+    parâmetros fazem o PDF ser processado de novo. Diferente do
+    CacheTabelas, que guarda as tabelas cruas entre execuções, aqui fica o
+    progresso de uma execução; a pasta é apagada quando ela termina sem falhas.
+    """
+
+    def __init__(self, pasta: str, versao: str, **params):
+        self.pasta = pasta
+        self.versao = versao
+        self.params = params
+
+    def _caminho(self, arquivo: str) -> str:
+        return os.path.join(self.pasta, f"{arquivo}.pkl")
+
+    def _assinatura(self, caminho_pdf: str, **params) -> str:
+        descricao = json.dumps({"versao": self.versao, "params": {**self.params, **params}}, sort_keys=True,
+                               default=str)
+        return f"{CacheTabelas.hash_arquivo(caminho_pdf)}-{descricao}"
+
+    def obter(self, caminho_pdf: str, **params):
+        caminho = self._caminho(os.path.basename(caminho_pdf))
+        if not os.path.exists(caminho):
+            return None
+        try:
+            entrada = pd.read_pickle(caminho)
+        except Exception:
+            # checkpoint pela metade: o PDF é refeito
+            return None
+        if entrada.get("assinatura") != self._assinatura(caminho_pdf, **params):
+            return None
+        return entrada["resultado"]
+
+    def guardar(self, caminho_pdf: str, resultado, **params) -> None:
+        os.makedirs(self.pasta, exist_ok=True)
+        caminho = self._caminho(os.path.basename(caminho_pdf))
+        with gravacao_atomica(caminho) as temporario:
+            pd.to_pickle({"assinatura": self._assinatura(caminho_pdf, **params), "resultado": resultado}, temporario)
+
+    def limpar(self) -> None:
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+
+def registrar_falha(falhas: list[dict], arquivo: str, etapa: str, erro: BaseException) -> dict:
+    falha = {
+        "arquivo": arquivo,
+        "etapa": etapa,
+        "erro": repr(erro),
+        "traceback": "".join(traceback.format_exception(type(erro), erro, erro.__traceback__)),
+    }
+    falhas.append(falha)
+    return falha
+
+
+def gravar_falhas(caminho: str, falhas: list[dict]) -> None:
+    """Grava o manifesto de falhas da execução; sem falhas, remove o de uma execução anterior."""
+    if not falhas:
+        if os.path.exists(caminho):
+            os.remove(caminho)
+        return
+    with gravacao_atomica(caminho) as temporario:
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"data": datetime.now().isoformat(timespec="seconds"), "falhas": falhas}, f,
+                      ensure_ascii=False, indent=2)
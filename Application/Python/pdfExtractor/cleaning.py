@@ -1,8 +1,17 @@
-import pandas as pd
+import logging
 import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
 
-# === 1) Pasta onde estão os CSVs brutos ===
-input_folder = r"C:\Users\leoro\Desktop\UNESP\TCC 2.0\Application\Python\pdfExtractor\extracts"
+from esquema import COLS, coagir_contagens, corrigir_texto
+from instrumentacao import configurar, evento, medir
+from normalizacao import aplicar_mapa, dividir_tabelas, linhas_completas, mapear_cabecalho
+
+# === 1) Pasta onde estão os CSVs brutos (ou `python main.py clean --entrada ...`) ===
+input_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "extracts")
 
 # === 2) Padrão de colunas final esperado ===
 colunas_finais = [
@@ -10,41 +19,181 @@ colunas_finais = [
     'relacao_adic', 'vagas_reman', 'masc', 'fem', 'total',
     'metodo_ingresso', 'area'
 ]
+colunas_texto = ['curso', 'metodo_ingresso', 'area']
+colunas_numericas = [c for c in colunas_finais if c not in colunas_texto]
+
+# CSVs crus do camelot ("Exatas_regular_raw.csv": colunas "0", "1", ... e
+# cabeçalho em várias linhas) passam por normalizacao.py; as colunas do
+# esquema viram as daqui, e área e método de ingresso saem do nome do arquivo
+RE_EXTRACT_CRU = re.compile(r"^(?P<area>[^_]+)_(?P<metodo>.+)_raw\.csv$")
+AREAS = {'Biologicas': 'Biológicas'}
+NOMES_FINAIS = {
+    COLS['curso']: 'curso', COLS['vagas']: 'vagas', COLS['conv']: 'convocados', COLS['le']: 'lista_espera',
+    COLS['rel_ad']: 'relacao_adic', COLS['vagas_rem']: 'vagas_reman', COLS['mat_m']: 'masc',
+    COLS['mat_f']: 'fem', COLS['mat_total']: 'total',
+}
+
+
+def _esquema_parquet():
+    import pyarrow as pa
+
+    campos = []
+    for col in colunas_finais:
+        if col == 'curso':
+            campos.append((col, pa.string()))
+        elif col in colunas_texto:
+            campos.append((col, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            campos.append((col, pa.int64()))
+    # metadados do pandas de um bloco vazio já tipado: na leitura as
+    # contagens voltam como Int64 (e não float64 por causa dos nulos)
+    vazio = _tipar_bloco(pd.DataFrame(columns=colunas_finais))
+    metadados = pa.Table.from_pandas(vazio, schema=pa.schema(campos), preserve_index=False).schema.metadata
+    return pa.schema(campos, metadata=metadados)
+
+
+def _tipar_bloco(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df['curso'] = df['curso'].astype('string')
+    df[colunas_numericas] = coagir_contagens(df[colunas_numericas])
+    return df
+
+
+def _recortar(blocos):
+    # Nos CSVs crus um bloco não pode acabar no meio de um cabeçalho ou de um
+    # nome de curso quebrado em linhas: o que vem depois da última linha
+    # completa (curso + números) passa para o início do bloco seguinte.
+    resto = None
+    for bloco in blocos:
+        if resto is not None:
+            bloco = pd.concat([resto, bloco])
+        completas = np.flatnonzero(linhas_completas(bloco))
+        corte = int(completas[-1]) + 1 if len(completas) else 0
+        resto = bloco.iloc[corte:]
+        if corte:
+            yield bloco.iloc[:corte]
+    if resto is not None and len(resto):
+        yield resto
+
+
+def _do_cru(bloco: pd.DataFrame, mapa: dict | None, arquivo: str) -> tuple[pd.DataFrame, dict | None]:
+    # Um bloco pode ter várias tabelas empilhadas, cada uma com o seu
+    # cabeçalho; a primeira parte sem cabeçalho continua com o mapa do bloco
+    # anterior. Devolve o bloco no esquema final e o mapa da última tabela.
+    partes = []
+    for i, tabela in enumerate(dividir_tabelas(bloco)):
+        n_cabecalho = 0
+        if i > 0 or mapa is None:
+            mapa, n_cabecalho = mapear_cabecalho(tabela)
+        if mapa:
+            partes.append(aplicar_mapa(tabela.iloc[n_cabecalho:], mapa))
+    if not partes:
+        return pd.DataFrame(columns=colunas_finais), mapa
+    df = pd.concat(partes).rename(columns=NOMES_FINAIS)
+    nome = RE_EXTRACT_CRU.match(arquivo)
+    if nome is not None:
+        df['metodo_ingresso'] = nome['metodo']
+        df['area'] = AREAS.get(nome['area'], nome['area'])
+    return df, mapa
+
+
+def limpar_extracts(pasta_entrada: str, caminho_saida: str = "dados_bauru_unificado.csv", filtro: str = "BAURU",
+                    chunksize: int = 50_000, formatos: tuple[str, ...] = ("csv", "parquet")) -> int:
+    """Unifica os CSVs de pasta_entrada filtrando os cursos que contêm filtro.
+
+    Cada arquivo é lido em blocos de chunksize linhas e cada bloco já é
+    gravado na saída (CSV em modo append e/ou um row group no Parquet), então
+    a memória fica limitada a um bloco por vez, independente do volume total.
+    CSVs crus do camelot (colunas "0", "1", ...) têm o cabeçalho de cada
+    tabela mapeado por normalizacao.py (ver _do_cru). As saídas são escritas
+    em temporários e trocadas no final. Devolve o total de linhas gravadas.
+    """
+    csv_tmp = caminho_saida + ".tmp"
+    parquet_final = os.path.splitext(caminho_saida)[0] + ".parquet"
+    parquet_tmp = parquet_final + ".tmp"
 
-# === 3) Lista para armazenar os DataFrames filtrados ===
-dfs_bauru = []
+    writer = None
+    if "parquet" in formatos:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
 
-# === 4) Loop em todos os CSVs na pasta ===
-for arquivo in os.listdir(input_folder):
-    if arquivo.endswith(".csv"):
-        caminho = os.path.join(input_folder, arquivo)
+        esquema = _esquema_parquet()
+        writer = pq.ParquetWriter(parquet_tmp, esquema, compression="zstd")
 
-        # Ler CSV
-        df = pd.read_csv(caminho)
+    inicio = time.perf_counter()
+    total = 0
+    cabecalho = True
+    try:
+        for arquivo in sorted(os.listdir(pasta_entrada)):
+            if not arquivo.endswith(".csv"):
+                continue
+            caminho = os.path.join(pasta_entrada, arquivo)
 
-        # Garantir a coluna 'vagas_reman'
-        if 'vagas_reman' not in df.columns:
-            df['vagas_reman'] = pd.NA
+            encontrados = 0
+            with medir("arquivo_limpeza", arquivo=arquivo) as m:
+                lidas = 0
+                colunas = pd.read_csv(caminho, nrows=0).columns
+                cru = 'curso' not in colunas and all(c.isdigit() for c in colunas)
+                blocos = pd.read_csv(caminho, chunksize=chunksize, dtype=str)
+                if cru:
+                    blocos = _recortar(blocos)
+                elif 'curso' not in colunas:
+                    evento("ignorado", f"⚠️ Ignorado: {arquivo} não tem a coluna 'curso'", logging.WARNING,
+                           arquivo=arquivo)
+                    blocos = []
+                mapa = None
+                for n_bloco, bloco in enumerate(blocos):
+                    lidas += len(bloco)
 
-        # Filtrar apenas cursos de Bauru (case-insensitive)
-        df_bauru = df[df['curso'].str.upper().str.contains('BAURU', na=False)].copy()
+                    with medir("bloco", arquivo=arquivo, bloco=n_bloco, linhas=len(bloco)) as mb:
+                        if cru:
+                            bloco, mapa = _do_cru(bloco, mapa, arquivo)
+                        bloco = bloco.assign(curso=corrigir_texto(bloco['curso']))
+                        # Filtrar apenas cursos do campus (case-insensitive) e garantir
+                        # todas as colunas finais, já na ordem certa
+                        filtrado = bloco[bloco['curso'].str.upper().str.contains(filtro.upper(), na=False)]
+                        filtrado = filtrado.reindex(columns=colunas_finais)
+                        mb["linhas_filtradas"] = len(filtrado)
+                        if filtrado.empty:
+                            continue
 
-        # Garantir que todas as colunas finais existem
-        for col in colunas_finais:
-            if col not in df_bauru.columns:
-                df_bauru[col] = pd.NA
+                        if "csv" in formatos:
+                            filtrado.to_csv(csv_tmp, index=False, mode="w" if cabecalho else "a", header=cabecalho)
+                            cabecalho = False
+                        if writer is not None:
+                            writer.write_table(pa.Table.from_pandas(_tipar_bloco(filtrado), schema=esquema,
+                                                                    preserve_index=False))
+                    encontrados += len(filtrado)
+                m.update(linhas_lidas=lidas, linhas=encontrados)
 
-        # Reordenar as colunas
-        df_bauru = df_bauru[colunas_finais]
+            total += encontrados
+            evento("processado", f"✅ Processado: {arquivo} | {filtro.title()} encontrados: {encontrados}",
+                   logging.INFO, arquivo=arquivo, linhas=encontrados)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            os.remove(parquet_tmp)
+        if os.path.exists(csv_tmp):
+            os.remove(csv_tmp)
+        raise
 
-        # Anexar à lista
-        dfs_bauru.append(df_bauru)
+    if "csv" in formatos:
+        if cabecalho:
+            # nenhuma linha encontrada: ainda assim grava o cabeçalho
+            pd.DataFrame(columns=colunas_finais).to_csv(csv_tmp, index=False)
+        os.replace(csv_tmp, caminho_saida)
+        evento("salvo", f"\n✅ Arquivo final salvo: {caminho_saida} | Total linhas: {total}", logging.INFO,
+               caminho=caminho_saida, formato="csv", linhas=total)
+    if writer is not None:
+        writer.close()
+        os.replace(parquet_tmp, parquet_final)
+        evento("salvo", f"✅ Arquivo final salvo: {parquet_final}", logging.INFO,
+               caminho=parquet_final, formato="parquet", linhas=total)
 
-        print(f"✅ Processado: {arquivo} | Bauru encontrados: {len(df_bauru)}")
+    evento("limpeza", linhas=total, segundos=round(time.perf_counter() - inicio, 6))
+    return total
 
-# === 5) Concatenar tudo ===
-df_final_bauru = pd.concat(dfs_bauru, ignore_index=True)
 
-# === 6) Salvar CSV final ===
-df_final_bauru.to_csv("dados_bauru_unificado.csv", index=False)
-print(f"\n✅ Arquivo final salvo: dados_bauru_unificado.csv | Total linhas: {len(df_final_bauru)}")
+if __name__ == "__main__":
+    configurar()
+    limpar_extracts(input_folder)
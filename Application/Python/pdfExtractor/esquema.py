@@ -0,0 +1,219 @@
+import contextlib
+import os
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+
+# Nomes das colunas do dataset consolidado usado pelo dashboard
+COLS = {
+    "curso": "curso",
+    "ano": "ano_origem",
+    "tipo": "tipo",  # Ampla / Isentos / Convênio
+    "vagas": "vagas",
+    "vagas_rem": "vagas_remanescentes",
+    "mat_total": "matriculados_total",
+    "mat_m": "matriculados_sexo_masc",
+    "mat_f": "matriculados_sexo_fem",
+    "conv": "matrículas_chamada_conv",
+    "le": "matrículas_chamada_le",
+    "rel_ad": "matrículas_relação_adicional",
+}
+
+COLUNAS_CONTAGEM = [
+    COLS["vagas"], COLS["vagas_rem"], COLS["mat_total"],
+    COLS["mat_m"], COLS["mat_f"], COLS["conv"], COLS["le"], COLS["rel_ad"],
+]
+
+# Colunas de metadados que o extrator acrescenta às tabelas do camelot
+COLUNAS_ORIGEM = ["tabela_origem", "arquivo_origem", "ano_origem"]
+
+# Rótulo da coluna tipo para cada categoria de tabela (paginas.categoria_do_cabecalho)
+TIPOS = {"ampla": "Ampla Concorrência", "se": "Convênio SE", "isento": "Isentos"}
+
+# Formato dos CSVs consolidados (exportados do Excel)
+ENCODING = "latin1"
+SEP = ";"
+
+# Folga das contagens em compactar: o tipo escolhido ainda comporta a soma
+# de até FOLGA_SOMA colunas da mesma linha (ex.: masc + fem) sem estourar
+FOLGA_SOMA = 16
+
+
+def _corrigir(texto: str) -> str:
+    try:
+        # UTF-8 lido como latin1 (ex.: CSV que passou pelo Excel): "CiÃªncias" -> "Ciências"
+        texto = texto.encode(ENCODING).decode("utf-8")
+    except UnicodeError:
+        pass
+    # NFKC desfaz as ligaduras do PDF ("ﬁ" -> "fi"); o split/join tira
+    # quebras de linha do camelot e espaços repetidos
+    return " ".join(unicodedata.normalize("NFKC", texto).split())
+
+
+def corrigir_texto(serie: pd.Series) -> pd.Series:
+    """Conserta encoding e espaços de uma coluna de texto inteira.
+
+    A correção roda uma vez por valor distinto e volta por map, então o custo
+    depende do número de cursos e não do número de linhas.
+    """
+    distintos = serie.dropna().unique()
+    if len(distintos) == 0:
+        return serie
+    return serie.map(dict(zip(distintos, map(_corrigir, distintos))))
+
+
+def coagir_contagens(bloco: pd.DataFrame) -> pd.DataFrame:
+    """Converte todas as colunas de bloco para Int64 numa passada só.
+
+    Texto: as células de todas as colunas são fatoradas juntas e só os
+    valores distintos (poucas centenas de contagens diferentes) passam pelo
+    to_numeric; o resultado volta pelos códigos. Colunas já numéricas passam
+    direto. Vazio, texto ou número quebrado vira nulo.
+    """
+    if all(pd.api.types.is_numeric_dtype(tipo) for tipo in bloco.dtypes):
+        numeros = bloco.to_numpy(dtype="float64", na_value=np.nan)
+    else:
+        codigos, distintos = pd.factorize(bloco.to_numpy(dtype=object).ravel())
+        convertidos = pd.to_numeric(pd.Series(distintos, dtype=object), errors="coerce")
+        # código -1 (célula nula) cai no NaN acrescentado no fim
+        convertidos = np.append(convertidos.to_numpy(dtype="float64", na_value=np.nan), np.nan)
+        numeros = convertidos[codigos].reshape(bloco.shape)
+    numeros[numeros % 1 != 0] = np.nan
+    return pd.DataFrame(numeros, index=bloco.index, columns=bloco.columns).astype("Int64")
+
+
+def tipar_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """Aplica o esquema do dashboard: ano Int64, contagens int, curso/tipo categóricos.
+
+    Também é o esquema do Parquet das saídas do extrator, que já saem com as
+    colunas de COLS (ver normalizacao.py).
+    """
+    df = df.copy()
+    for c in ["tabela_origem", COLS["ano"]]:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
+    if "arquivo_origem" in df.columns:
+        df["arquivo_origem"] = df["arquivo_origem"].astype("category")
+    contagens = [c for c in COLUNAS_CONTAGEM if c in df.columns]
+    df[contagens] = coagir_contagens(df[contagens]).fillna(0).astype(int)
+    for c in [COLS["curso"], COLS["tipo"]]:
+        # nas partições do extrator o tipo fica no caminho (tipo=...), não na tabela
+        if c in df.columns:
+            df[c] = corrigir_texto(df[c].astype(str)).astype("category")
+    return df
+
+
+def _menor_inteiro(serie: pd.Series, folga: int = 1) -> str:
+    # menor inteiro com sinal que comporta os valores vezes a folga
+    minimo, maximo = serie.min(), serie.max()
+    if pd.isna(minimo):
+        return "int8"
+    for tipo in ("int8", "int16", "int32"):
+        limites = np.iinfo(tipo)
+        if limites.min <= int(minimo) * folga and int(maximo) * folga <= limites.max:
+            return tipo
+    return "int64"
+
+
+def compactar(df: pd.DataFrame) -> pd.DataFrame:
+    """Representação compacta do dataset em memória (dashboard).
+
+    Texto vira categórico e os inteiros vão para o menor tipo seguro:
+    contagens com FOLGA_SOMA, ano e tabela de origem na versão anulável
+    (Int16...). Somas por groupby/sum continuam no tipo compacto quando
+    cabem nele; quem faz contas sobre elas converte para int64 (ex.:
+    agregacoes._somar). Os Parquet gravados continuam em int64, para
+    partições e blocos da limpeza terem sempre o mesmo esquema.
+    """
+    df = df.copy()
+    for c in [COLS["curso"], COLS["tipo"], "arquivo_origem"]:
+        if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype("category")
+    for c in COLUNAS_CONTAGEM:
+        if c in df.columns:
+            df[c] = df[c].astype(_menor_inteiro(df[c], FOLGA_SOMA))
+    for c in ["tabela_origem", COLS["ano"]]:
+        if c in df.columns:
+            df[c] = df[c].astype(_menor_inteiro(df[c]).capitalize())
+    return df
+
+
+def caminho_parquet(caminho: str) -> str:
+    return os.path.splitext(caminho)[0] + ".parquet"
+
+
+def dataset_padrao(pasta_saida: str) -> str:
+    """Dataset do dashboard: o bauru.csv publicado pelo extrator (três categorias).
+
+    Antes da primeira extração vale o bauru_ampla.csv consolidado à mão que
+    vem no repositório, que também traz as três categorias.
+    """
+    publicado = os.path.join(pasta_saida, "bauru.csv")
+    return publicado if os.path.exists(publicado) else os.path.join(pasta_saida, "bauru_ampla.csv")
+
+
+@contextlib.contextmanager
+def gravacao_atomica(caminho: str):
+    """Devolve um caminho temporário para o bloco gravar e, no final, troca pelo definitivo.
+
+    Quem estiver lendo (ex.: o dashboard) nunca vê um arquivo pela metade; se
+    o bloco falhar, o temporário é apagado e o arquivo anterior fica intacto.
+    """
+    temporario = caminho + ".tmp"
+    try:
+        yield temporario
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    os.replace(temporario, caminho)
+
+
+def salvar_parquet(df: pd.DataFrame, caminho: str) -> None:
+    with gravacao_atomica(caminho) as temporario:
+        df.to_parquet(temporario, index=False, compression="zstd")
+
+
+def ler_csv(caminho: str, **opcoes) -> pd.DataFrame:
+    """Lê um CSV consolidado: exportado do Excel (latin1, ";") ou saído do extrator (UTF-8, ",").
+
+    opcoes vão direto para o pd.read_csv (ex.: dtype=str).
+    """
+    with open(caminho, "rb") as f:
+        primeira_linha = f.readline()
+    if SEP.encode() in primeira_linha:
+        return pd.read_csv(caminho, encoding=ENCODING, sep=SEP, **opcoes)
+    return pd.read_csv(caminho, **opcoes)
+
+
+def ler_dataset(caminho_csv: str) -> pd.DataFrame:
+    """Lê o dataset do dashboard, preferindo o Parquet irmão do CSV.
+
+    O Parquet já vem com o esquema resolvido e é lido com memory map, então
+    não há parse de texto nem conversão de tipos. Se ele não existir ou for
+    mais antigo que o CSV, cai no CSV e tipa na hora.
+    """
+    parquet = caminho_parquet(caminho_csv)
+    if os.path.exists(parquet) and (
+        not os.path.exists(caminho_csv) or os.path.getmtime(parquet) >= os.path.getmtime(caminho_csv)
+    ):
+        return pd.read_parquet(parquet, memory_map=True)
+    return tipar_dataset(ler_csv(caminho_csv))
+
+
+def converter_para_parquet(caminho_csv: str) -> str:
+    """Gera o Parquet tipado ao lado de um CSV consolidado e devolve o caminho."""
+    parquet = caminho_parquet(caminho_csv)
+    salvar_parquet(tipar_dataset(ler_csv(caminho_csv)), parquet)
+    return parquet
+
+
+def versao_dataset(caminho_csv: str) -> float:
+    """mtime mais recente entre o CSV e o Parquet do dataset (0.0 se nenhum existir).
+
+    Serve de chave de cache: muda sempre que alguma das versões é republicada.
+    """
+    arquivos = (caminho_csv, caminho_parquet(caminho_csv))
+    return max((os.path.getmtime(f) for f in arquivos if os.path.exists(f)), default=0.0)
@@ -1,57 +1,682 @@
+import glob
+import logging
+import multiprocessing
 import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
-import camelot
 
+from cache_pdf import CacheTabelas
+from checkpoints import Checkpoints, gravar_falhas, registrar_falha
+from esquema import COLS, TIPOS, caminho_parquet, gravacao_atomica, ler_csv, salvar_parquet, tipar_dataset
+from instrumentacao import evento, medir
+from normalizacao import VERSAO_NORMALIZACAO, colapsar_cabecalho, normalizar_valores
+from paginas import ano_do_pdf, indexar_paginas, normalizar_texto, paginas_com, paginas_de_tabela
+from validacao import ARQUIVO_QUARENTENA, gravar_validacao, ler_quarentena, validar
+
+
+# Versão da lógica de leitura: incrementar sempre que o que vai para o cache
+# mudar (ex.: outro pós-processamento das tabelas do camelot).
+VERSAO_EXTRATOR = "2"
+
+# Flavor do camelot; junto com as páginas lidas, faz parte da chave do cache
+FLAVOR_CAMELOT = "stream"
+
+# Os cursos vêm como "Curso - turno - Campus": o campus é o último trecho
+RE_CAMPUS = r"\s-\s([^-]+?)\s*$"
+
+# Campi da UNESP, já no formato usado nas partições. Os nomes quebrados em
+# várias linhas pelo camelot ("São José do" / "Rio Preto") já chegam juntos
+# pela normalização (normalizacao.aplicar_mapa).
+CAMPI_UNESP = {
+    "aracatuba", "araraquara", "assis", "bauru", "botucatu", "dracena", "franca", "guaratingueta",
+    "ilha_solteira", "itapeva", "jaboticabal", "marilia", "ourinhos", "presidente_prudente", "registro",
+    "rio_claro", "rosana", "sao_joao_da_boa_vista", "sao_jose_do_rio_preto", "sao_jose_dos_campos",
+    "sao_paulo", "sao_vicente", "sorocaba", "tupa",
+}
+ALIASES_CAMPUS = {
+    "s._jose_do_rio_preto": "sao_jose_do_rio_preto",
+    "litoral_paulista": "sao_vicente",
+}
+
+# Dentro de pasta_saida: checkpoints da execução em andamento e manifesto de
+# falhas. O "." e o "_" iniciais marcam os dois como arquivos internos; no
+# particionado eles ficam fora das raízes csv/ e parquet/ (ver extrair_campi).
+PASTA_CHECKPOINTS = ".checkpoints"
+ARQUIVO_FALHAS = "_falhas_extracao.json"
+# No particionado, quarentena e relatório de validação de cada ano ficam em
+# pasta_saida/_validacao/ano=<ano>/ (ver _validar_campi)
+PASTA_VALIDACAO = "_validacao"
+
+
+def _ler_tabelas(caminho: str, paginas: list[int]) -> tuple[list[tuple[int, pd.DataFrame]], list[dict]]:
+    """Roda o camelot só nas páginas indicadas. É a parte cara, executada no pool quando workers > 1.
+
+    O camelot é chamado página a página (mesmo resultado e custo de uma
+    chamada só) para devolver também o tempo e o número de tabelas de cada
+    página; quem emite os eventos é o processo principal.
+    """
+    # import aqui: o camelot (e a pilha OpenCV/ghostscript dele) leva mais de
+    # meio segundo para carregar e só é preciso quando há PDF para ler
+    import camelot
+
+    tabelas = []
+    medidas = []
+    for pagina in paginas:
+        inicio = time.perf_counter()
+        tables = camelot.read_pdf(caminho, pages=str(pagina), flavor=FLAVOR_CAMELOT)
+        medidas.append({"pagina": pagina, "tabelas": len(tables), "segundos": round(time.perf_counter() - inicio, 6)})
+        tabelas.extend((int(t.page), t.df) for t in tables)
+    return tabelas, medidas
 
-def extrair_bauru_em_csvs(pasta_pdf: str, campus_alvo: str = "bauru", pasta_saida: str = "./saida") -> None:
-    arquivos_pdf = sorted([f for f in os.listdir(pasta_pdf) if f.lower().endswith(".pdf")])
 
-    ampla = []
-    se = []
-    isento = []
+def _colapsar(df: pd.DataFrame, arquivo: str, pagina: int) -> pd.DataFrame | None:
+    tabela = colapsar_cabecalho(df)
+    if tabela is None:
+        evento("tabela_ignorada", f"⚠️ Tabela sem cabeçalho reconhecido: {arquivo}, página {pagina} "
+                                  f"({df.shape[1]} colunas)", logging.WARNING,
+               arquivo=arquivo, pagina=pagina, colunas=df.shape[1])
+    return tabela
 
-    # Índices fixos das tabelas para cada categoria
-    indices_ampla = {0, 3, 6, 7}
-    indices_se = {1, 4, 8, 9}
-    indices_isento = {2, 5, 10, 11}
 
-    for idx, arquivo in enumerate(arquivos_pdf):
-        ano = 2015 + idx
+def _classificar(tabelas: list[tuple[int, pd.DataFrame]], categorias: dict[int, str], arquivo: str, ano: int,
+                 campus_alvo: str):
+    # A categoria vem do cabeçalho da página ("TABELA 11 - Convênio com a SE"...),
+    # detectado por paginas.indexar_paginas, e não mais da posição da tabela.
+    # Cada tabela sai do camelot já com as colunas de esquema.COLS; os valores
+    # são convertidos de uma vez só, sobre as linhas do campus de todas elas.
+    partes = []
+    for pagina, df in tabelas:
+        if df.empty:
+            continue
+
+        categoria = categorias.get(pagina)
+        with medir("tabela", arquivo=arquivo, pagina=pagina, categoria=categoria, linhas=len(df),
+                   colunas=df.shape[1]) as m:
+            tabela = _colapsar(df, arquivo, pagina)
+            filtrado = tabela if tabela is None else \
+                tabela[tabela[COLS["curso"]].str.contains(campus_alvo, case=False, na=False)]
+            m["linhas_campus"] = 0 if filtrado is None else len(filtrado)
+
+        if filtrado is not None and not filtrado.empty and categoria in TIPOS:
+            # tabela_origem passa a ser a página do PDF de onde a tabela saiu
+            partes.append(filtrado.assign(tabela_origem=pagina, arquivo_origem=arquivo, ano_origem=ano,
+                                          tipo=TIPOS[categoria]))
+
+    resultados = {categoria: [] for categoria in TIPOS}
+    if partes:
+        df = normalizar_valores(pd.concat(partes, ignore_index=True))
+        for categoria, lista in resultados.items():
+            grupo = df[df[COLS["tipo"]] == TIPOS[categoria]]
+            if not grupo.empty:
+                lista.append(grupo.reset_index(drop=True))
+    return resultados["ampla"], resultados["se"], resultados["isento"]
+
+
+def _falhar(falhas: list[dict], arquivo: str, etapa: str, erro: Exception, parar_no_erro: bool) -> None:
+    registrar_falha(falhas, arquivo, etapa, erro)
+    evento("erro_pdf", f"Erro ao processar {arquivo}: {erro}", logging.ERROR, arquivo=arquivo, etapa=etapa,
+           erro=repr(erro))
+    if parar_no_erro:
+        raise erro
+
+
+def _fechar_execucao(checkpoints: Checkpoints, falhas: list[dict], manifesto: str) -> None:
+    # sem falhas a execução está completa e os checkpoints não servem mais;
+    # com falhas eles ficam, para retomar=True refazer só os PDFs que faltaram
+    if not falhas:
+        checkpoints.limpar()
+        return
+    evento("falhas", f"⚠️ {len(falhas)} PDF(s) com erro, detalhes em {manifesto}. "
+                     "Rode de novo com retomar=True para refazer só esses.", logging.WARNING,
+           falhas=len(falhas), manifesto=manifesto)
+
+
+def _tarefas(pasta_pdf: str, arquivos: list[str], anos: list[int] | None, falhas: list[dict],
+             parar_no_erro: bool) -> list[tuple[str, str, int]]:
+    """(caminho, arquivo, ano) de cada PDF, com o ano de paginas.ano_do_pdf.
+
+    O ano não depende mais da posição do arquivo na pasta, então dá para
+    processar só alguns anos (anos) ou acrescentar um PDF antigo sem deslocar
+    os outros. PDF sem ano identificável vai para falhas.
+    """
+    tarefas = []
+    for arquivo in arquivos:
         caminho = os.path.join(pasta_pdf, arquivo)
-        print(f"📄 Processando: {arquivo} (ano: {ano})")
+        try:
+            ano = ano_do_pdf(caminho)
+            if ano is None:
+                raise ValueError("ano não encontrado no nome do arquivo nem nos metadados do PDF")
+        except Exception as e:
+            _falhar(falhas, arquivo, "ano", e, parar_no_erro)
+            continue
+        if anos is None or ano in anos:
+            tarefas.append((caminho, arquivo, ano))
+    return tarefas
+
+
+def _ler_pdfs(tarefas: list[tuple[str, str, int]], escolher_paginas, workers: int, cache: CacheTabelas | None,
+              falhas: list[dict], parar_no_erro: bool = False,
+              mp_context: multiprocessing.context.BaseContext | None = None):
+    """Lê as tabelas de cada PDF, na ordem de tarefas.
 
+    Para cada PDF lido com sucesso gera (arquivo, ano, tabelas, categorias),
+    onde tabelas é a lista de (página, DataFrame) do camelot e categorias
+    mapeia página -> ampla/se/isento. escolher_paginas recebe o índice de
+    paginas.indexar_paginas e devolve as páginas que o camelot deve ler.
+    PDFs com erro vão para falhas e são pulados, ou interrompem tudo se
+    parar_no_erro. mp_context escolhe como os processos do pool nascem
+    (None = padrão da plataforma).
+    """
+    # Pré-varredura da camada de texto: descobre quais páginas interessam e
+    # a categoria de cada página, para o camelot só ler o necessário.
+    paginas = {}
+    categorias = {}
+    for caminho, arquivo, _ in tarefas:
         try:
-            tables = camelot.read_pdf(caminho, pages='all', flavor='stream')
-            for i, t in enumerate(tables):
-                df = t.df
-                if df.empty:
+            with medir("pre_varredura", arquivo=arquivo) as m:
+                indice = indexar_paginas(caminho)
+                m["paginas"] = len(indice)
+        except Exception as e:
+            _falhar(falhas, arquivo, "pre_varredura", e, parar_no_erro)
+            continue
+        paginas[arquivo] = escolher_paginas(indice)
+        categorias[arquivo] = {p["pagina"]: p["categoria"] for p in indice}
+    tarefas = [t for t in tarefas if t[1] in paginas]
+
+    # Consulta o cache antes de tudo: só os PDFs novos ou alterados vão
+    # para o camelot. PDF sem nenhuma página de interesse nem chega a ele.
+    tabelas_por_pdf = {arquivo: [] for arquivo, pags in paginas.items() if not pags}
+    chaves = {}
+    if cache is not None:
+        for caminho, arquivo, _ in tarefas:
+            if arquivo in tabelas_por_pdf:
+                continue
+            chaves[arquivo] = cache.chave(caminho, VERSAO_EXTRATOR, flavor=FLAVOR_CAMELOT, pages=paginas[arquivo])
+            tabelas = cache.obter(chaves[arquivo])
+            if tabelas is not None:
+                tabelas_por_pdf[arquivo] = tabelas
+    pendentes = [t for t in tarefas if t[1] not in tabelas_por_pdf]
+
+    # workers > 1: cada PDF vai para um processo do pool. Os resultados são
+    # consumidos na ordem dos arquivos, então a concatenação (e o CSV final)
+    # fica idêntica à execução serial.
+    pool = None
+    futuros = {}
+    if workers > 1 and len(pendentes) > 1:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(pendentes)), mp_context=mp_context)
+        futuros = {arquivo: pool.submit(_ler_tabelas, caminho, paginas[arquivo]) for caminho, arquivo, _ in pendentes}
+
+    try:
+        for caminho, arquivo, ano in tarefas:
+            evento("pdf", f"📄 Processando: {arquivo} (ano: {ano})", logging.INFO,
+                   arquivo=arquivo, ano=ano, paginas=paginas[arquivo])
+
+            tabelas = tabelas_por_pdf.get(arquivo)
+            if tabelas is not None:
+                evento("camelot", arquivo=arquivo, origem="cache", tabelas=len(tabelas))
+            else:
+                inicio = time.perf_counter()
+                try:
+                    if arquivo in futuros:
+                        tabelas, medidas = futuros[arquivo].result()
+                    else:
+                        tabelas, medidas = _ler_tabelas(caminho, paginas[arquivo])
+                except Exception as e:
+                    _falhar(falhas, arquivo, "camelot", e, parar_no_erro)
                     continue
+                for m in medidas:
+                    evento("pagina", arquivo=arquivo, **m)
+                # no pool, segundos é a soma das páginas (o tempo de espera aqui não diz nada)
+                evento("camelot", arquivo=arquivo, origem="pool" if arquivo in futuros else "serial",
+                       tabelas=len(tabelas), segundos=round(
+                           sum(m["segundos"] for m in medidas) if arquivo in futuros
+                           else time.perf_counter() - inicio, 6))
+                if cache is not None:
+                    cache.guardar(chaves[arquivo], tabelas)
 
-                primeira_coluna = df.columns[0]
-                filtrado = df[df[primeira_coluna].str.contains(campus_alvo, case=False, na=False)].copy()
+            yield arquivo, ano, tabelas, categorias[arquivo]
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
 
-                if not filtrado.empty:
-                    filtrado["tabela_origem"] = i + 1
-                    filtrado["arquivo_origem"] = arquivo
-                    filtrado["ano_origem"] = ano
 
-                    if i in indices_ampla:
-                        ampla.append(filtrado)
-                    elif i in indices_se:
-                        se.append(filtrado)
-                    elif i in indices_isento:
-                        isento.append(filtrado)
+def _salvar_csv(df: pd.DataFrame, caminho: str) -> None:
+    with gravacao_atomica(caminho) as temporario:
+        df.to_csv(temporario, index=False)
 
-        except Exception as e:
-            print(f"Erro ao processar {arquivo}: {e}")
 
+def _salvar(df: pd.DataFrame, caminho_csv: str, formatos: tuple[str, ...]) -> None:
+    if "csv" in formatos:
+        with medir("salvar", caminho=caminho_csv, formato="csv", linhas=len(df)):
+            _salvar_csv(df, caminho_csv)
+    if "parquet" in formatos:
+        with medir("salvar", caminho=caminho_parquet(caminho_csv), formato="parquet", linhas=len(df)):
+            salvar_parquet(tipar_dataset(df), caminho_parquet(caminho_csv))
+
+
+def _ler_saida(caminho: str, categoria: str) -> pd.DataFrame | None:
+    """Saída de uma execução anterior, como texto, para o upsert; None se ela não der para mesclar.
+
+    Não dá para mesclar uma saída ilegível, sem as colunas do extrator (ex.:
+    a do formato antigo do camelot, com colunas "0", "1"...) ou com linhas
+    de outro tipo (ex.: um dataset consolidado do Excel, latin1 com ";").
+    """
+    try:
+        df = ler_csv(caminho, dtype=str, keep_default_na=False)
+    except (UnicodeDecodeError, pd.errors.ParserError, pd.errors.EmptyDataError):
+        return None
+    if not {COLS["curso"], "arquivo_origem", "tipo"} <= set(df.columns) or (df["tipo"] != TIPOS[categoria]).any():
+        return None
+    return df
+
+
+def _salvar_particao(df: pd.DataFrame, pasta_saida: str, particao: str, formatos: tuple[str, ...]) -> None:
+    # uma raiz por formato (pasta_saida/csv, pasta_saida/parquet): um leitor
+    # de Parquet apontado para a raiz não tropeça nos CSVs
+    for formato in formatos:
+        pasta = os.path.join(pasta_saida, formato, particao)
+        os.makedirs(pasta, exist_ok=True)
+        caminho = os.path.join(pasta, f"dados.{formato}")
+        with medir("salvar", caminho=caminho, formato=formato, linhas=len(df)):
+            if formato == "csv":
+                _salvar_csv(df, caminho)
+            else:
+                salvar_parquet(tipar_dataset(df), caminho)
+
+
+def _mesclar(existente: pd.DataFrame | None, novos: list[pd.DataFrame], extraidos: set[str],
+             ordem_arquivos: list[str]) -> pd.DataFrame:
+    """Upsert das linhas novas sobre um CSV de saída já existente.
+
+    As linhas antigas dos PDFs reextraídos são descartadas e o resultado é
+    reordenado pela ordem dos arquivos, igual a uma reconstrução completa.
+    """
+    partes = []
+    if existente is not None:
+        partes.append(existente[~existente["arquivo_origem"].isin(extraidos)])
+    partes.extend(novos)
+    df = pd.concat(partes, ignore_index=True)
+
+    posicao = {arquivo: i for i, arquivo in enumerate(ordem_arquivos)}
+    ordem = df["arquivo_origem"].map(posicao).fillna(len(posicao))
+    return df.iloc[ordem.argsort(kind="stable")].reset_index(drop=True)
+
+
+def _validar(por_categoria: dict[str, pd.DataFrame | None], pasta_saida: str) -> pd.DataFrame:
+    # valida o dataset inteiro, inclusive as saídas que não mudaram nesta
+    # execução, para os duplicados serem vistos entre todos os PDFs; devolve
+    # as linhas válidas indexadas por (categoria, linha)
+    partes = {categoria: df for categoria, df in por_categoria.items() if df is not None}
+    with medir("validar", linhas=sum(map(len, partes.values()))):
+        validas, quarentena, relatorio = validar(pd.concat(partes))
+        gravar_validacao(pasta_saida, quarentena, relatorio)
+    _avisar_validacao(relatorio, pasta_saida)
+    return validas
+
+
+def _avisar_validacao(relatorio: dict, pasta: str) -> None:
+    if relatorio["quarentena"]:
+        detalhe = ", ".join(f"{nome}: {n}" for nome, n in relatorio["checagens"].items() if n)
+        evento("validacao", f"⚠️ {relatorio['quarentena']} linha(s) inconsistente(s) em quarentena ({detalhe}), "
+               f"ver {os.path.join(pasta, ARQUIVO_QUARENTENA)}", logging.WARNING, **relatorio)
+    else:
+        evento("validacao", f"✅ Validação: {relatorio['linhas']} linhas consistentes.", logging.INFO, **relatorio)
+
+
+def _validar_campi(df: pd.DataFrame, pasta_saida: str, ano: int) -> pd.DataFrame:
+    """Valida as linhas de um PDF campus a campus e devolve só as válidas.
+
+    Cada PDF é um ano, então os duplicados (curso, ano, tipo) aparecem dentro
+    dele. A quarentena (com a coluna campus) e o relatório, com os totais e
+    o resumo de cada campus, vão para pasta_saida/_validacao/ano=<ano>/,
+    regravados a cada vez que o ano é processado.
+    """
+    validas, quarentenas, por_campus = [df.iloc[:0]], [], {}
+    with medir("validar", ano=ano, linhas=len(df)):
+        # PDF sem nenhuma tabela de campus: _rotear devolve um frame sem colunas
+        for campus, grupo in (df.groupby("campus", sort=True) if not df.empty else []):
+            v, q, por_campus[campus] = validar(grupo)
+            validas.append(v)
+            quarentenas.append(q)
+        relatorio = {
+            chave: sum(r[chave] for r in por_campus.values())
+            for chave in ("linhas", "validas", "quarentena", "chamada_tolerada")
+        }
+        relatorio["checagens"] = {
+            nome: sum(r["checagens"][nome] for r in por_campus.values())
+            for nome in next(iter(por_campus.values()), {"checagens": {}})["checagens"]
+        }
+        pasta = os.path.join(pasta_saida, PASTA_VALIDACAO, f"ano={ano}")
+        os.makedirs(pasta, exist_ok=True)
+        quarentena = pd.concat(quarentenas, ignore_index=True) if quarentenas else pd.DataFrame()
+        gravar_validacao(pasta, quarentena, {**relatorio, "campi": por_campus})
+    _avisar_validacao(relatorio, pasta)
+    return pd.concat(validas)
+
+
+def extrair_bauru_em_csvs(pasta_pdf: str, campus_alvo: str = "bauru", pasta_saida: str = "./saida",
+                          workers: int = 1, cache: CacheTabelas | None = None, incremental: bool = False,
+                          reprocessar: list[str] | None = None, formatos: tuple[str, ...] = ("csv",),
+                          retomar: bool = False, parar_no_erro: bool = False,
+                          anos: list[int] | None = None,
+                          mp_context: multiprocessing.context.BaseContext | None = None) -> None:
+    """Extrai as tabelas do campus para bauru_ampla/bauru_se/bauru_isento.csv.
+
+    As três categorias saem também juntas em bauru.csv, o dataset do
+    dashboard (main.py serve/build-parquet), regravado a cada execução que muda
+    alguma saída.
+
+    O ano de cada PDF vem do nome do arquivo (ou dos metadados, ver
+    paginas.ano_do_pdf); anos restringe a execução a esses anos. Mesmo sem
+    incremental, as linhas dos outros anos continuam nas saídas: os PDFs de
+    anos são relidos por inteiro e entram por upsert.
+
+    Com incremental=True, os CSVs existentes em pasta_saida são mantidos e só
+    os PDFs que ainda não aparecem em arquivo_origem (mais os listados em
+    reprocessar) são lidos; as linhas deles entram por upsert. O modo
+    incremental (e o upsert de anos) se baseia nos CSVs: sem "csv" em
+    formatos, a execução avisa e extrai todos os PDFs.
+
+    As saídas têm as colunas do dataset do dashboard (esquema.COLS, ver
+    normalizacao.py) mais tabela_origem/arquivo_origem/ano_origem/tipo.
+    formatos aceita "csv" e "parquet"; o Parquet sai ao lado de cada CSV,
+    com o esquema de esquema.tipar_dataset.
+
+    Antes de gravar, o dataset inteiro passa por validacao.validar: linhas
+    inconsistentes (total != masc + fem, chamadas que não fecham com o
+    total, curso/ano/tipo repetido) ficam fora das saídas, em
+    pasta_saida/_quarentena.csv, e o resumo vai para _validacao.json. No
+    modo incremental a quarentena é revalidada junto com as saídas.
+
+    Cada PDF concluído ganha um checkpoint em pasta_saida/.checkpoints; com
+    retomar=True os PDFs que já têm checkpoint não são lidos de novo (ex.:
+    depois de uma queda no meio da execução). PDFs com erro são listados em
+    pasta_saida/_falhas_extracao.json e pulados, ou interrompem a execução
+    na hora com parar_no_erro=True. Os checkpoints são apagados quando a
+    execução termina sem falhas.
+
+    mp_context vai para o pool do camelot (ver _ler_pdfs); quem chama de
+    dentro de uma thread, como o vigia, precisa de "spawn" ou "forkserver".
+    """
+    inicio = time.perf_counter()
+    arquivos_pdf = sorted([f for f in os.listdir(pasta_pdf) if f.lower().endswith(".pdf")])
+
+    saidas = {
+        "ampla": os.path.join(pasta_saida, "bauru_ampla.csv"),
+        "se": os.path.join(pasta_saida, "bauru_se.csv"),
+        "isento": os.path.join(pasta_saida, "bauru_isento.csv"),
+    }
+    combinado = os.path.join(pasta_saida, "bauru.csv")
+    resultados = {categoria: [] for categoria in saidas}
+
+    os.makedirs(pasta_saida, exist_ok=True)
+    checkpoints = Checkpoints(os.path.join(pasta_saida, PASTA_CHECKPOINTS), VERSAO_EXTRATOR, campus=campus_alvo,
+                              normalizacao=VERSAO_NORMALIZACAO)
+    manifesto = os.path.join(pasta_saida, ARQUIVO_FALHAS)
+    falhas = []
+
+    if (incremental or anos is not None) and "csv" not in formatos:
+        # as saídas existentes são lidas dos CSVs: sem eles nada seria achado e
+        # a execução viraria uma reconstrução calada (ou, com anos, perderia
+        # as linhas dos outros anos)
+        evento("incremental_sem_csv", "⚠️ Modo incremental e anos precisam de \"csv\" em formatos: "
+               "extraindo todos os PDFs.", logging.WARNING, formatos=list(formatos))
+        incremental, anos = False, None
+
+    if anos is not None and not incremental:
+        incremental, reprocessar = True, arquivos_pdf
+
+    pendentes = arquivos_pdf
+    existentes = {}
+    if incremental:
+        existentes = {categoria: _ler_saida(caminho, categoria)
+                      for categoria, caminho in saidas.items() if os.path.exists(caminho)}
+        if any(df is None for df in existentes.values()):
+            # não dá para mesclar com as novas, então tudo é extraído de novo
+            evento("formato_antigo", "⚠️ Saídas ilegíveis ou em outro formato (ex.: o antigo do camelot): "
+                   "extraindo todos os PDFs de novo.", logging.WARNING, pasta=pasta_saida)
+            existentes = {}
+            # só os anos pedidos deixariam as saídas sem os outros anos
+            anos = None
+        # as linhas em quarentena também já foram extraídas: voltam para a
+        # validação junto com as saídas e saem de novo se continuarem erradas
+        quarentena = ler_quarentena(os.path.join(pasta_saida, ARQUIVO_QUARENTENA))
+        if quarentena is not None and existentes:
+            categoria_do_tipo = {rotulo: categoria for categoria, rotulo in TIPOS.items()}
+            for categoria, barradas in quarentena.groupby(quarentena["tipo"].map(categoria_do_tipo)):
+                if categoria in existentes:
+                    existentes[categoria] = pd.concat([existentes[categoria], barradas], ignore_index=True)
+        ja_extraidos = set().union(*(set(df["arquivo_origem"]) for df in existentes.values()))
+        ja_extraidos -= set(reprocessar or [])
+        pendentes = [arquivo for arquivo in arquivos_pdf if arquivo not in ja_extraidos]
+
+    # (ampla, se, isento) de cada PDF concluído, vindo do checkpoint ou da leitura
+    por_pdf = {}
+    try:
+        tarefas = _tarefas(pasta_pdf, pendentes, anos, falhas, parar_no_erro)
+        if incremental and not tarefas and os.path.exists(combinado):
+            _fechar_execucao(checkpoints, falhas, manifesto)
+            evento("extracao", "✅ Nenhum PDF novo: saídas já estão atualizadas.", logging.INFO,
+                   pdfs=0, linhas=0, falhas=len(falhas), segundos=round(time.perf_counter() - inicio, 6))
+            return
+
+        if retomar:
+            for caminho, arquivo, ano in tarefas:
+                retomado = checkpoints.obter(caminho, ano=ano)
+                if retomado is not None:
+                    por_pdf[arquivo] = retomado
+                    evento("retomado", f"⏩ Retomado do checkpoint: {arquivo}", logging.INFO, arquivo=arquivo)
+        caminhos = {arquivo: caminho for caminho, arquivo, _ in tarefas}
+
+        for arquivo, ano, tabelas, categorias in _ler_pdfs([t for t in tarefas if t[1] not in por_pdf],
+                                                          lambda indice: paginas_com(indice, campus_alvo),
+                                                          workers, cache, falhas, parar_no_erro, mp_context):
+            try:
+                with medir("classificar", arquivo=arquivo, tabelas=len(tabelas)) as m:
+                    por_pdf[arquivo] = _classificar(tabelas, categorias, arquivo, ano, campus_alvo)
+                    m["linhas"] = sum(len(df) for lista in por_pdf[arquivo] for df in lista)
+            except Exception as e:
+                _falhar(falhas, arquivo, "classificar", e, parar_no_erro)
+                continue
+            checkpoints.guardar(caminhos[arquivo], por_pdf[arquivo], ano=ano)
+    finally:
+        gravar_falhas(manifesto, falhas)
+
+    # monta as listas na ordem dos arquivos, venham do checkpoint ou não
+    extraidos = set()
+    for _, arquivo, _ in tarefas:
+        if arquivo in por_pdf:
+            a, s, i = por_pdf[arquivo]
+            resultados["ampla"].extend(a)
+            resultados["se"].extend(s)
+            resultados["isento"].extend(i)
+            extraidos.add(arquivo)
+
+    finais = {}
+    for categoria in saidas:
+        novos = resultados[categoria]
+        df = None
+        with medir("concat", categoria=categoria, partes=len(novos)) as m:
+            if incremental:
+                existente = existentes.get(categoria)
+                substituidos = existente is not None and existente["arquivo_origem"].isin(extraidos).any()
+                if novos or substituidos:
+                    df = _mesclar(existente, novos, extraidos, arquivos_pdf)
+            elif novos:
+                df = pd.concat(novos, ignore_index=True)
+            m["linhas"] = 0 if df is None else len(df)
+        if df is not None:
+            finais[categoria] = df
+
+    linhas = 0
+    por_categoria = {categoria: finais.get(categoria, existentes.get(categoria)) for categoria in saidas}
+    if finais or (not os.path.exists(combinado) and any(df is not None for df in por_categoria.values())):
+        validas = _validar(por_categoria, pasta_saida)
+        for categoria, df in finais.items():
+            df = validas[validas.index.get_level_values(0) == categoria].reset_index(drop=True)
+            _salvar(df, saidas[categoria], formatos)
+            linhas += len(df)
+        # por último o dataset do dashboard, com a mesma troca atômica
+        _salvar(validas.reset_index(drop=True), combinado, formatos)
+
+    if cache is not None:
+        evento("cache", cache.relatorio(), logging.INFO, **cache.estatisticas())
+    _fechar_execucao(checkpoints, falhas, manifesto)
+    evento("extracao", "✅ Arquivos salvos com sucesso!", logging.INFO,
+           pdfs=len(extraidos), linhas=linhas, falhas=len(falhas), segundos=round(time.perf_counter() - inicio, 6))
+
+
+def _slug_campus(nome: str) -> str | None:
+    slug = normalizar_texto(nome).strip().replace(" ", "_")
+    slug = ALIASES_CAMPUS.get(slug, slug)
+    return slug if slug in CAMPI_UNESP else None
+
+
+def _textos_campus(slug: str) -> list[str]:
+    # como o campus aparece no texto do PDF: o slug com espaços e os apelidos de ALIASES_CAMPUS
+    return [nome.replace("_", " ") for nome in (slug, *(a for a, alvo in ALIASES_CAMPUS.items() if alvo == slug))]
+
+
+def _rotear(tabelas: list[tuple[int, pd.DataFrame]], categorias: dict[int, str], arquivo: str, ano: int,
+            campi: set[str] | None) -> pd.DataFrame:
+    """Junta todas as tabelas do PDF e marca campus e tipo de cada linha de uma vez.
+
+    Substitui o str.contains por tabela: o campus sai de um único str.extract
+    sobre o curso e a normalização roda só nos valores distintos. Os valores
+    das linhas que ficam são convertidos numa passada só (normalizar_valores).
+    """
+    partes = []
+    for pagina, df in tabelas:
+        if df.empty or categorias.get(pagina) is None:
+            continue
+        tabela = _colapsar(df, arquivo, pagina)
+        if tabela is not None:
+            partes.append(tabela.assign(tabela_origem=pagina, tipo=categorias[pagina]))
+    if not partes:
+        return pd.DataFrame()
+    df = pd.concat(partes, ignore_index=True)
+
+    nomes = df[COLS["curso"]].str.extract(RE_CAMPUS, expand=False)
+    campus = nomes.map({nome: _slug_campus(nome) for nome in nomes.dropna().unique()})
+    mascara = campus.notna()
+    if campi is not None:
+        mascara &= campus.isin(campi)
+
+    df = normalizar_valores(df[mascara])
+    df["arquivo_origem"] = arquivo
+    df["ano_origem"] = ano
+    df["campus"] = campus[mascara]
+    return df
+
+
+def extrair_campi(pasta_pdf: str, pasta_saida: str = "./saida/campi", campi: list[str] | None = None,
+                  workers: int = 1, cache: CacheTabelas | None = None, formatos: tuple[str, ...] = ("csv",),
+                  retomar: bool = False, parar_no_erro: bool = False, anos: list[int] | None = None) -> None:
+    """Extrai todos os campi (ou só os de campi) lendo cada PDF uma única vez.
+
+    Grava um dataset particionado no estilo hive, uma raiz por formato:
+        pasta_saida/csv/campus=<campus>/ano=<ano>/tipo=<ampla|se|isento>/dados.csv
+        pasta_saida/parquet/campus=<campus>/ano=<ano>/tipo=<ampla|se|isento>/dados.parquet
+    Cada raiz só tem arquivos do seu formato, então pasta_saida/parquet pode
+    ser lida direto (pd.read_parquet, pyarrow, duckdb). Todas as partições
+    têm as mesmas colunas dos bauru_*.csv, menos o tipo (que vai no caminho);
+    no Parquet, com o esquema de esquema.tipar_dataset. As partições de um
+    ano são recriadas sempre que o PDF daquele ano é processado.
+
+    Antes de gravar, as linhas de cada campus passam por validacao.validar,
+    como em extrair_bauru_em_csvs; as barradas ficam fora das partições, em
+    pasta_saida/_validacao/ano=<ano>/_quarentena.csv (ver _validar_campi).
+
+    As partições já são gravadas PDF a PDF; o checkpoint só marca os PDFs
+    concluídos, para retomar=True pular esses. Falhas, parar_no_erro e anos
+    funcionam como em extrair_bauru_em_csvs; como cada execução só mexe nas
+    partições dos seus anos, execuções com anos diferentes podem rodar em
+    paralelo na mesma pasta_saida.
+    """
+    inicio = time.perf_counter()
+    arquivos_pdf = sorted([f for f in os.listdir(pasta_pdf) if f.lower().endswith(".pdf")])
+
+    alvo = None
+    if campi is not None:
+        alvo = {_slug_campus(c) for c in campi}
+        if None in alvo:
+            raise ValueError(f"Campus desconhecido em {campi}; válidos: {sorted(CAMPI_UNESP)}")
+    if alvo is None:
+        escolher_paginas = paginas_de_tabela
+    else:
+        def escolher_paginas(indice):
+            return sorted({p for c in alvo for texto in _textos_campus(c) for p in paginas_com(indice, texto)})
+
+    # execuções de anos diferentes em paralelo não podem dividir checkpoints
+    # nem manifesto (uma apagaria os da outra ao terminar)
+    escopo = "" if anos is None else "_anos=" + "-".join(map(str, sorted(anos)))
     os.makedirs(pasta_saida, exist_ok=True)
+    checkpoints = Checkpoints(os.path.join(pasta_saida, PASTA_CHECKPOINTS + escopo), VERSAO_EXTRATOR,
+                              campi=sorted(alvo) if alvo is not None else None, normalizacao=VERSAO_NORMALIZACAO)
+    base, extensao = os.path.splitext(ARQUIVO_FALHAS)
+    manifesto = os.path.join(pasta_saida, base + escopo + extensao)
+    falhas = []
+    try:
+        tarefas = _tarefas(pasta_pdf, arquivos_pdf, anos, falhas, parar_no_erro)
+    finally:
+        gravar_falhas(manifesto, falhas)
+
+    # as partições de um ano são apagadas e recriadas pelo PDF daquele ano
+    por_ano = {}
+    for _, arquivo, ano in tarefas:
+        por_ano.setdefault(ano, []).append(arquivo)
+    repetidos = {ano: arquivos for ano, arquivos in por_ano.items() if len(arquivos) > 1}
+    if repetidos:
+        raise ValueError(f"Mais de um PDF para o mesmo ano: {repetidos}")
+
+    # o checkpoint de cada PDF guarda só quantas partições ele gerou
+    particoes = 0
+    if retomar:
+        retomados = []
+        for t in tarefas:
+            gravadas = checkpoints.obter(t[0], ano=t[2])
+            if gravadas is None:
+                continue
+            particoes += gravadas
+            retomados.append(t)
+            evento("retomado", f"⏩ Retomado do checkpoint: {t[1]}", logging.INFO, arquivo=t[1])
+        tarefas = [t for t in tarefas if t not in retomados]
+    caminhos = {arquivo: caminho for caminho, arquivo, _ in tarefas}
+
+    try:
+        for arquivo, ano, tabelas, categorias in _ler_pdfs(tarefas, escolher_paginas, workers, cache, falhas,
+                                                          parar_no_erro):
+            try:
+                with medir("rotear", arquivo=arquivo, tabelas=len(tabelas)) as m:
+                    df = _rotear(tabelas, categorias, arquivo, ano, alvo)
+                    m["linhas"] = len(df)
+
+                # nas duas raízes (um formato que saiu de formatos não fica com o ano
+                # velho) e no layout antigo, sem raiz por formato
+                for padrao in (os.path.join("*", "campus=*"), "campus=*"):
+                    for antiga in glob.glob(os.path.join(pasta_saida, padrao, f"ano={ano}")):
+                        shutil.rmtree(antiga)
 
-    if ampla:
-        pd.concat(ampla, ignore_index=True).to_csv(os.path.join(pasta_saida, "bauru_ampla.csv"), index=False)
-    if se:
-        pd.concat(se, ignore_index=True).to_csv(os.path.join(pasta_saida, "bauru_se.csv"), index=False)
-    if isento:
-        pd.concat(isento, ignore_index=True).to_csv(os.path.join(pasta_saida, "bauru_isento.csv"), index=False)
+                df = _validar_campi(df, pasta_saida, ano)
+                gravadas = 0
+                if not df.empty:
+                    for (campus, tipo), grupo in df.groupby(["campus", "tipo"], sort=True):
+                        particao = os.path.join(f"campus={campus}", f"ano={ano}", f"tipo={tipo}")
+                        _salvar_particao(grupo.drop(columns=["campus", "tipo"]), pasta_saida, particao, formatos)
+                        gravadas += 1
+            except Exception as e:
+                _falhar(falhas, arquivo, "gravar_particoes", e, parar_no_erro)
+                continue
+            particoes += gravadas
+            checkpoints.guardar(caminhos[arquivo], gravadas, ano=ano)
+    finally:
+        gravar_falhas(manifesto, falhas)
 
-    print("✅ Arquivos salvos com sucesso!")
+    if cache is not None:
+        evento("cache", cache.relatorio(), logging.INFO, **cache.estatisticas())
+    _fechar_execucao(checkpoints, falhas, manifesto)
+    evento("extracao", f"✅ Dataset particionado salvo em {pasta_saida} ({particoes} partições)", logging.INFO,
+           particoes=particoes, falhas=len(falhas), segundos=round(time.perf_counter() - inicio, 6))
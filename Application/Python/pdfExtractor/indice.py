@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from esquema import COLS
+
+
+class DatasetIndexado:
+    """DataFrame ordenado por ano com índices pré-calculados para os filtros.
+
+    - anos: vetor ordenado; um intervalo de anos vira um par de searchsorted
+      e, portanto, uma fatia contígua de linhas;
+    - curso/tipo: códigos categóricos; o filtro por lista vira uma tabela de
+      lookup booleana indexada pelos códigos (sem isin sobre texto);
+    - linhas_por_curso / limites_por_ano: posições de cada chave, para o
+      drilldown e os KPIs por ano não varrerem o frame com ==.
+
+    Os filtros devolvem posições (np.ndarray); as linhas só são
+    materializadas em linhas(), quando alguém realmente precisa do frame.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        df = df.copy()
+        for c in [COLS["curso"], COLS["tipo"]]:
+            if not isinstance(df[c].dtype, pd.CategoricalDtype):
+                df[c] = df[c].astype("category")
+        self.df = df.sort_values(COLS["ano"], kind="stable", ignore_index=True)
+
+        self.anos = self.df[COLS["ano"]].to_numpy(dtype="int64", na_value=np.iinfo("int64").max)
+        self.codigos_curso = self.df[COLS["curso"]].cat.codes.to_numpy()
+        self.codigos_tipo = self.df[COLS["tipo"]].cat.codes.to_numpy()
+        self.cursos = self.df[COLS["curso"]].cat.categories
+        self.tipos = self.df[COLS["tipo"]].cat.categories
+
+        valores, inicios = np.unique(self.anos, return_index=True)
+        fins = np.append(inicios[1:], len(self.anos))
+        self.limites_por_ano = {int(a): (int(i), int(f)) for a, i, f in zip(valores, inicios, fins)}
+        self.linhas_por_curso = {
+            self.cursos[codigo]: posicoes
+            for codigo, posicoes in pd.Series(self.codigos_curso).groupby(self.codigos_curso).indices.items()
+            if codigo >= 0
+        }
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def _selecao(self, categorias: pd.Index, escolhidos) -> np.ndarray | None:
+        # None = todas as categorias escolhidas, não precisa de máscara
+        codigos = categorias.get_indexer(list(escolhidos))
+        codigos = codigos[codigos >= 0]
+        if len(codigos) == len(categorias):
+            return None
+        selecao = np.zeros(len(categorias) + 1, dtype=bool)  # +1: código -1 (nulo) cai na última posição
+        selecao[codigos] = True
+        return selecao
+
+    def filtrar(self, anos: tuple[int, int], cursos, tipos) -> np.ndarray:
+        """Posições das linhas que passam nos filtros da barra lateral."""
+        inicio = int(np.searchsorted(self.anos, anos[0], side="left"))
+        fim = int(np.searchsorted(self.anos, anos[1], side="right"))
+
+        mascara = None
+        for categorias, codigos, escolhidos in (
+            (self.cursos, self.codigos_curso, cursos),
+            (self.tipos, self.codigos_tipo, tipos),
+        ):
+            selecao = self._selecao(categorias, escolhidos)
+            if selecao is not None:
+                m = selecao[codigos[inicio:fim]]
+                mascara = m if mascara is None else mascara & m
+
+        if mascara is None:
+            return np.arange(inicio, fim)
+        return inicio + np.flatnonzero(mascara)
+
+    def do_curso(self, posicoes: np.ndarray, curso: str) -> np.ndarray:
+        linhas = self.linhas_por_curso.get(curso)
+        if linhas is None:
+            return posicoes[:0]
+        return np.intersect1d(posicoes, linhas, assume_unique=True)
+
+    def do_ano(self, posicoes: np.ndarray, ano: int) -> np.ndarray:
+        # posicoes é ordenado e as linhas de um ano são contíguas
+        inicio, fim = self.limites_por_ano.get(int(ano), (0, 0))
+        return posicoes[np.searchsorted(posicoes, inicio):np.searchsorted(posicoes, fim)]
+
+    def linhas(self, posicoes: np.ndarray) -> pd.DataFrame:
+        if len(posicoes) and posicoes[-1] - posicoes[0] + 1 == len(posicoes):
+            # faixa contígua: fatia, sem gather
+            return self.df.iloc[posicoes[0]:posicoes[-1] + 1]
+        return self.df.take(posicoes)
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from esquema import COLS
+
+
+# Motor da aba Insights. Tudo parte de duas tabelas largas (curso × ano e
+# tipo × ano) montadas com um único groupby + unstack; as métricas são
+# operações sobre colunas inteiras, sem apply nem merge por grupo.
+
+
+def tabela_curso_ano(dfx: pd.DataFrame) -> pd.DataFrame:
+    """Matrículas por curso (linhas) e ano (colunas). NaN = curso sem dados no ano."""
+    return (
+        dfx.groupby([COLS["curso"], COLS["ano"]], observed=True)[COLS["mat_total"]].sum()
+        .unstack(COLS["ano"])
+        .sort_index(axis=1)
+    )
+
+
+def participacao_tipo_ano(dfx: pd.DataFrame) -> pd.DataFrame:
+    """Participação de cada tipo no total do ano, em formato longo (ano, tipo, mat, part)."""
+    g = (
+        dfx.groupby([COLS["ano"], COLS["tipo"]], as_index=False, observed=True)[COLS["mat_total"]].sum()
+        .rename(columns={COLS["mat_total"]: "mat"})
+    )
+    tot = g.groupby(COLS["ano"])["mat"].transform("sum")
+    g["part"] = np.where(tot > 0, g["mat"] / tot.where(tot > 0), np.nan)
+    return g
+
+
+def crescimento_por_curso(tabela: pd.DataFrame) -> pd.DataFrame:
+    """Variação do primeiro para o último ano do período, só cursos presentes nos dois."""
+    first_year, last_year = tabela.columns[0], tabela.columns[-1]
+    comp = (
+        tabela[[first_year, last_year]]
+        .set_axis(["mat_first", "mat_last"], axis=1)
+        .dropna()
+        .astype("int64")
+        .reset_index()
+    )
+    comp["delta_abs"] = comp["mat_last"] - comp["mat_first"]
+    comp["delta_pct"] = np.where(comp["mat_first"] > 0, comp["delta_abs"] / comp["mat_first"].where(comp["mat_first"] > 0), np.nan)
+    return comp
+
+
+def top_variacoes(comp: pd.DataFrame, n: int = 3) -> tuple[pd.DataFrame, pd.DataFrame]:
+    top_up = comp.sort_values(["delta_abs", "delta_pct"], ascending=[False, False]).head(n)
+    top_down = comp.sort_values(["delta_abs", "delta_pct"], ascending=[True, True]).head(n)
+    return top_up, top_down
+
+
+def mudanca_participacao(part: pd.DataFrame, first_year, last_year) -> pd.DataFrame:
+    """Participação de cada tipo no primeiro e no último ano e a diferença em pontos percentuais."""
+    largo = part.pivot(index=COLS["tipo"], columns=COLS["ano"], values="part")
+    comp_part = pd.DataFrame({
+        "part_first": largo[first_year] if first_year in largo.columns else np.nan,
+        "part_last": largo[last_year] if last_year in largo.columns else np.nan,
+    }, index=largo.index).reset_index()
+    comp_part = comp_part.dropna(subset=["part_first", "part_last"], how="all")
+    comp_part["delta_pp"] = (comp_part["part_last"] - comp_part["part_first"]) * 100
+    return comp_part.reset_index(drop=True)
+
+
+def cagr_por_curso(tabela: pd.DataFrame) -> pd.DataFrame:
+    """Taxa composta de crescimento anual entre o primeiro e o último ano com dados de cada curso."""
+    anos = np.asarray(tabela.columns, dtype="float64")
+    presente = tabela.notna().to_numpy()
+    tem_dados = presente.any(axis=1)
+
+    i_primeiro = presente.argmax(axis=1)
+    i_ultimo = presente.shape[1] - 1 - presente[:, ::-1].argmax(axis=1)
+    valores = tabela.to_numpy(dtype="float64")
+    linhas = np.arange(len(tabela))
+    mat_primeiro = valores[linhas, i_primeiro]
+    mat_ultimo = valores[linhas, i_ultimo]
+    periodo = anos[i_ultimo] - anos[i_primeiro]
+
+    validos = tem_dados & (periodo > 0) & (mat_primeiro > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cagr = np.where(validos, (mat_ultimo / mat_primeiro) ** (1 / np.where(periodo > 0, periodo, 1)) - 1, np.nan)
+
+    return pd.DataFrame({
+        COLS["curso"]: tabela.index,
+        "ano_inicio": np.where(tem_dados, anos[i_primeiro], np.nan),
+        "ano_fim": np.where(tem_dados, anos[i_ultimo], np.nan),
+        "mat_inicio": mat_primeiro,
+        "mat_fim": mat_ultimo,
+        "cagr": cagr,
+    })
+
+
+def yoy_movel(tabela: pd.DataFrame, janela: int = 3) -> pd.DataFrame:
+    """Variação ano a ano de cada curso, suavizada por média móvel de `janela` anos."""
+    yoy = tabela.pct_change(axis=1, fill_method=None).replace([np.inf, -np.inf], np.nan)
+    return yoy.T.rolling(janela, min_periods=1).mean().T
+
+
+def ranking_curso_ano(tabela: pd.DataFrame) -> pd.DataFrame:
+    """Posição de cada curso em cada ano (1 = mais matrículas); NaN se o curso não teve dados."""
+    return tabela.rank(axis=0, ascending=False, method="min")
+
+
+def mudanca_ranking(tabela: pd.DataFrame) -> pd.DataFrame:
+    """Posição no primeiro e no último ano de cada curso e quantas posições ele subiu."""
+    ranking = ranking_curso_ano(tabela)
+    presente = ranking.notna()
+    pos_inicio = ranking.bfill(axis=1).iloc[:, 0]
+    pos_fim = ranking.ffill(axis=1).iloc[:, -1]
+    return pd.DataFrame({
+        "pos_inicio": pos_inicio,
+        "pos_fim": pos_fim,
+        "subiu": pos_inicio - pos_fim,
+        "melhor_pos": ranking.min(axis=1),
+        "pior_pos": ranking.max(axis=1),
+        "anos_com_dados": presente.sum(axis=1),
+    }).reset_index()
+
+
+def calcular_insights(dfx: pd.DataFrame, n: int = 3, janela_yoy: int = 3) -> dict | None:
+    """Tudo o que a aba Insights mostra, a partir das linhas filtradas."""
+    if dfx.empty:
+        return None
+
+    tabela = tabela_curso_ano(dfx)
+    first_year, last_year = tabela.columns[0], tabela.columns[-1]
+
+    top_up, top_down = top_variacoes(crescimento_por_curso(tabela), n)
+    comp_part = mudanca_participacao(participacao_tipo_ano(dfx), first_year, last_year)
+
+    cagr = cagr_por_curso(tabela)
+    cagr["yoy_movel"] = yoy_movel(tabela, janela_yoy).ffill(axis=1).iloc[:, -1].to_numpy()
+
+    return {
+        "first_year": first_year, "last_year": last_year,
+        "top_up": top_up, "top_down": top_down, "comp_part": comp_part,
+        "cagr": cagr.sort_values("cagr", ascending=False, na_position="last", ignore_index=True),
+        "ranking": mudanca_ranking(tabela).sort_values(["subiu", "pos_fim"], ascending=[False, True],
+                                                      na_position="last", ignore_index=True),
+    }
@@ -0,0 +1,166 @@
+import contextlib
+import json
+import logging
+import sys
+import time
+import tracemalloc
+
+
+# Instrumentação do extrator e da limpeza. Tudo passa pelo logger
+# "pdfExtractor": as mensagens de progresso saem em INFO e as medições
+# detalhadas (por PDF, página e tabela) em DEBUG, com os números em
+# record.dados. Um "hook" é qualquer logging.Handler pendurado nesse logger;
+# configurar() liga o console e/ou um arquivo JSON lines, registrar_hook()
+# aceita uma função qualquer. Sem configuração nada é impresso além de avisos
+# e erros, então importar os módulos numa outra aplicação não suja a saída.
+logger = logging.getLogger("pdfExtractor")
+
+
+def evento(nome: str, mensagem: str | None = None, nivel: int = logging.DEBUG, **dados) -> None:
+    """Emite um evento; mensagem é o texto do console (sem ela, vale o nome)."""
+    if logger.isEnabledFor(nivel):
+        logger.log(nivel, mensagem if mensagem is not None else nome, extra={"evento": nome, "dados": dados})
+
+
+@contextlib.contextmanager
+def medir(nome: str, **dados):
+    """Mede o bloco e emite o evento `nome` com segundos e delta de memória.
+
+    Devolve o dicionário de dados, para o bloco acrescentar o que só sabe no
+    final (linhas, tabelas...). O delta de memória só é medido com
+    tracemalloc ligado (configurar(memoria=True)); fora isso fica None.
+    """
+    memoria_antes = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+    inicio = time.perf_counter()
+    try:
+        yield dados
+    finally:
+        dados["segundos"] = round(time.perf_counter() - inicio, 6)
+        dados["memoria_delta_mb"] = (
+            round((tracemalloc.get_traced_memory()[0] - memoria_antes) / 2**20, 3)
+            if memoria_antes is not None and tracemalloc.is_tracing() else None
+        )
+        evento(nome, **dados)
+
+
+class JsonLinesHandler(logging.Handler):
+    """Grava cada evento como uma linha JSON: ts, nivel, evento, mensagem e os dados."""
+
+    def __init__(self, caminho: str):
+        super().__init__()
+        self.arquivo = open(caminho, "a", encoding="utf-8")
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            linha = {
+                "ts": round(record.created, 6),
+                "nivel": record.levelname,
+                "evento": getattr(record, "evento", None),
+                "mensagem": record.getMessage(),
+                **getattr(record, "dados", {}),
+            }
+            self.arquivo.write(json.dumps(linha, ensure_ascii=False, default=str) + "\n")
+            self.arquivo.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        self.arquivo.close()
+        super().close()
+
+
+class _HookFuncao(logging.Handler):
+    def __init__(self, funcao, nivel: int):
+        super().__init__(nivel)
+        self.funcao = funcao
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.funcao(getattr(record, "evento", None), getattr(record, "dados", {}))
+
+
+def _habilitar(nivel: int) -> None:
+    if logger.level == logging.NOTSET or logger.level > nivel:
+        logger.setLevel(nivel)
+
+
+def registrar_hook(funcao, nivel: int = logging.DEBUG) -> logging.Handler:
+    """Chama funcao(evento, dados) para cada evento a partir de nivel. Devolve o handler, para remover_hook."""
+    hook = _HookFuncao(funcao, nivel)
+    logger.addHandler(hook)
+    _habilitar(nivel)
+    return hook
+
+
+def remover_hook(hook: logging.Handler) -> None:
+    logger.removeHandler(hook)
+    hook.close()
+
+
+def configurar(console: bool = True, jsonl: str | None = None, nivel_console: int = logging.INFO,
+               memoria: bool = False) -> list[logging.Handler]:
+    """Liga as saídas de instrumentação usadas pelos scripts do projeto.
+
+    console: mensagens de progresso no stdout (o antigo print).
+    jsonl: caminho de um arquivo que recebe todos os eventos, inclusive os
+        de DEBUG com as medições por PDF/página/tabela.
+    memoria: liga o tracemalloc para os deltas de memória (deixa tudo mais lento).
+    """
+    handlers = []
+    if console:
+        h = logging.StreamHandler(sys.stdout)
+        h.setLevel(nivel_console)
+        h.setFormatter(logging.Formatter("%(message)s"))
+        handlers.append(h)
+        _habilitar(nivel_console)
+    if jsonl:
+        h = JsonLinesHandler(jsonl)
+        h.setLevel(logging.DEBUG)
+        handlers.append(h)
+        _habilitar(logging.DEBUG)
+    for h in handlers:
+        logger.addHandler(h)
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return handlers
+
+
+@contextlib.contextmanager
+def perfilar(destino: str | None, motor: str = "cprofile"):
+    """Captura um perfil do bloco em destino (None = não perfila).
+
+    motor="cprofile" grava as estatísticas do cProfile (abrir com pstats ou
+    snakeviz); motor="pyinstrument" grava o relatório HTML do pyinstrument,
+    que precisa estar instalado. Só o processo principal é perfilado: com
+    workers > 1 o camelot roda nos processos do pool e fica de fora.
+    """
+    if destino is None:
+        yield
+        return
+
+    if motor == "cprofile":
+        import cProfile
+
+        perfil = cProfile.Profile()
+        perfil.enable()
+        try:
+            yield
+        finally:
+            perfil.disable()
+            perfil.dump_stats(destino)
+    elif motor == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError as e:
+            raise RuntimeError("motor='pyinstrument' precisa do pacote pyinstrument (pip install pyinstrument)") from e
+
+        perfil = Profiler()
+        perfil.start()
+        try:
+            yield
+        finally:
+            perfil.stop()
+            with open(destino, "w", encoding="utf-8") as f:
+                f.write(perfil.output_html())
+    else:
+        raise ValueError(f"motor de perfil desconhecido: {motor!r} (use 'cprofile' ou 'pyinstrument')")
+    evento("perfil", f"📊 Perfil salvo em {destino}", logging.INFO, destino=destino, motor=motor)
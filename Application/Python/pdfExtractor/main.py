@@ -1,6 +1,216 @@
-from extractor import extrair_bauru_em_csvs
+"""Linha de comando do projeto: extração, limpeza, Parquet e dashboard.
 
-pasta = r'C:\Users\leoro\Desktop\UNESP\TCC 2.0\Application\Python\pdfExtractor\pdfs'
-saida = r'C:\Users\leoro\Desktop\UNESP\TCC 2.0\Application\Python\pdfExtractor\saida'
+    python main.py extract                        # Bauru, incremental, em ./saida
+    python main.py extract --campi                # todos os campi, particionado
+    python main.py extract --campi bauru marilia --anos 2023 2024 --workers 8
+    python main.py extract --invalidar 2024-47-58.pdf --cache-max-mb 256
+    python main.py clean --entrada extracts --saida dados_bauru_unificado.csv
+    python main.py build-parquet --dataset saida/bauru.csv
+    python main.py serve --dataset saida/bauru.csv
+    python main.py watch --intervalo 10           # extrai cada PDF novo que chegar em ./pdfs
 
-extrair_bauru_em_csvs(pasta_pdf=pasta, pasta_saida=saida)
+Os caminhos padrão são relativos a esta pasta, não ao diretório atual.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+
+pasta = os.path.join(PASTA, "pdfs")
+saida = os.path.join(PASTA, "saida")
+saida_campi = os.path.join(PASTA, "saida", "campi")
+cache = os.path.join(PASTA, ".cache_extracao")
+# teto padrão do cache de tabelas; passado dele, saem as entradas menos usadas
+CACHE_MAX_MB = 512
+extracts = os.path.join(PASTA, "extracts")
+unificado = os.path.join(PASTA, "dados_bauru_unificado.csv")
+app = os.path.join(PASTA, "app", "app.py")
+
+# variável de ambiente com o dataset que o app deve abrir (ver app/app.py)
+VAR_DATASET = "PDFEXTRACTOR_DATASET"
+
+
+# Os imports pesados (pandas, camelot, streamlit) ficam dentro dos comandos:
+# --help e argumentos inválidos respondem sem carregar nada disso.
+
+def _instrumentar(args):
+    from instrumentacao import configurar, perfilar
+
+    configurar(jsonl=args.eventos, memoria=args.memoria)
+    return perfilar(args.perfil, args.motor_perfil)
+
+
+def _cache_tabelas(args):
+    """CacheTabelas com o teto de --cache-max-mb, já com --limpar-cache/--invalidar aplicados."""
+    import logging
+
+    from cache_pdf import CacheTabelas
+    from instrumentacao import evento
+
+    if args.sem_cache:
+        return None
+    max_bytes = int(args.cache_max_mb * 2**20) if args.cache_max_mb > 0 else None
+    cache_tabelas = CacheTabelas(args.cache, max_bytes=max_bytes)
+    if args.limpar_cache:
+        removidas = cache_tabelas.limpar()
+        evento("cache_limpo", f"🧹 Cache limpo: {removidas} entrada(s) removida(s)", logging.INFO,
+               removidas=removidas)
+    for pdf in args.invalidar or []:
+        # nome solto = arquivo da pasta de PDFs
+        caminho = pdf if os.path.exists(pdf) else os.path.join(args.pdfs, pdf)
+        if not os.path.exists(caminho):
+            evento("cache_invalidar", f"⚠️ PDF não encontrado para invalidar: {pdf}", logging.WARNING, pdf=pdf)
+            continue
+        removidas = cache_tabelas.invalidar_arquivo(caminho)
+        evento("cache_invalidar", f"🧹 Cache de {os.path.basename(caminho)}: {removidas} entrada(s) removida(s)",
+               logging.INFO, pdf=caminho, removidas=removidas)
+    # um teto menor que o tamanho atual já vale nesta execução
+    cache_tabelas.despejar()
+    return cache_tabelas
+
+
+def cmd_extract(args) -> int:
+    from extractor import extrair_bauru_em_csvs, extrair_campi
+
+    with _instrumentar(args):
+        cache_tabelas = _cache_tabelas(args)
+        if args.campi is None:
+            extrair_bauru_em_csvs(pasta_pdf=args.pdfs, campus_alvo=args.campus, pasta_saida=args.saida or saida,
+                                  workers=args.workers, cache=cache_tabelas, incremental=not args.completo,
+                                  reprocessar=args.reprocessar, formatos=tuple(args.formatos), retomar=True,
+                                  parar_no_erro=args.parar_no_erro, anos=args.anos)
+        else:
+            extrair_campi(pasta_pdf=args.pdfs, pasta_saida=args.saida or saida_campi, campi=args.campi or None,
+                          workers=args.workers, cache=cache_tabelas, formatos=tuple(args.formatos), retomar=True,
+                          parar_no_erro=args.parar_no_erro, anos=args.anos)
+    return 0
+
+
+def cmd_clean(args) -> int:
+    from cleaning import limpar_extracts
+
+    with _instrumentar(args):
+        limpar_extracts(args.entrada, args.saida, filtro=args.filtro, chunksize=args.chunksize,
+                        formatos=tuple(args.formatos))
+    return 0
+
+
+def cmd_build_parquet(args) -> int:
+    import logging
+
+    from esquema import converter_para_parquet, dataset_padrao
+    from instrumentacao import evento
+
+    with _instrumentar(args):
+        parquet = converter_para_parquet(args.dataset or dataset_padrao(saida))
+        evento("parquet", f"✅ Dataset tipado salvo: {parquet}", logging.INFO, caminho=parquet)
+    return 0
+
+
+def cmd_watch(args) -> int:
+    import asyncio
+
+    from vigia import vigiar
+
+    with _instrumentar(args):
+        cache_tabelas = _cache_tabelas(args)
+        try:
+            asyncio.run(vigiar(args.pdfs, pasta_saida=args.saida, campus_alvo=args.campus, intervalo=args.intervalo,
+                               workers=args.workers, cache=cache_tabelas, formatos=tuple(args.formatos)))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def cmd_serve(args) -> int:
+    env = dict(os.environ)
+    if args.dataset:
+        # sem --dataset o próprio app escolhe o padrão (esquema.dataset_padrao)
+        env[VAR_DATASET] = os.path.abspath(args.dataset)
+    comando = [sys.executable, "-m", "streamlit", "run", app, "--server.port", str(args.porta)]
+    if args.headless:
+        comando += ["--server.headless", "true"]
+    return subprocess.call(comando, env=env)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    comandos = parser.add_subparsers(dest="comando", required=True, metavar="comando")
+
+    instrumentacao = argparse.ArgumentParser(add_help=False)
+    instrumentacao.add_argument("--eventos", help="grava todos os eventos (por PDF/página/tabela) neste JSON lines")
+    instrumentacao.add_argument("--memoria", action="store_true", help="mede deltas de memória (tracemalloc, mais lento)")
+    instrumentacao.add_argument("--perfil", help="grava um perfil da execução neste arquivo")
+    instrumentacao.add_argument("--motor-perfil", choices=["cprofile", "pyinstrument"], default="cprofile")
+
+    cache_camelot = argparse.ArgumentParser(add_help=False)
+    cache_camelot.add_argument("--cache", default=cache, help="pasta do cache de tabelas (padrão: ./.cache_extracao)")
+    cache_camelot.add_argument("--sem-cache", action="store_true", help="não usa o cache de tabelas do camelot")
+    cache_camelot.add_argument("--cache-max-mb", type=float, default=CACHE_MAX_MB,
+                               help=f"tamanho máximo do cache; 0 = sem limite (padrão: {CACHE_MAX_MB})")
+    cache_camelot.add_argument("--limpar-cache", action="store_true", help="apaga o cache de tabelas antes de começar")
+    cache_camelot.add_argument("--invalidar", nargs="+", metavar="PDF",
+                               help="apaga do cache as tabelas desses PDFs (nome na pasta --pdfs ou caminho), "
+                                    "para o camelot ler de novo")
+
+    p = comandos.add_parser("extract", parents=[instrumentacao, cache_camelot], help="extrai as tabelas dos PDFs")
+    p.add_argument("--pdfs", default=pasta, help="pasta com os PDFs (padrão: ./pdfs)")
+    p.add_argument("--saida", help="pasta de saída (padrão: ./saida, ou ./saida/campi com --campi)")
+    p.add_argument("--campus", default="bauru", help="campus dos CSVs bauru_*.csv (padrão: bauru)")
+    p.add_argument("--campi", nargs="*", metavar="CAMPUS",
+                   help="dataset particionado por campus/ano/tipo; sem nomes = todos os campi")
+    p.add_argument("--anos", type=int, nargs="+", metavar="ANO",
+                   help="processa só os PDFs desses anos (as linhas dos outros anos continuam nas saídas)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processos para o camelot")
+    p.add_argument("--formatos", nargs="+", choices=["csv", "parquet"], default=["csv", "parquet"])
+    p.add_argument("--completo", action="store_true", help="reconstrói as saídas em vez do modo incremental")
+    p.add_argument("--reprocessar", nargs="+", metavar="PDF", help="PDFs a reler mesmo já extraídos")
+    p.add_argument("--parar-no-erro", action="store_true", help="interrompe no primeiro PDF com erro")
+    p.set_defaults(func=cmd_extract)
+
+    p = comandos.add_parser("clean", parents=[instrumentacao], help="unifica e filtra os CSVs brutos")
+    p.add_argument("--entrada", default=extracts, help="pasta com os CSVs brutos (padrão: ./extracts)")
+    p.add_argument("--saida", default=unificado, help="CSV unificado de saída (padrão: ./dados_bauru_unificado.csv)")
+    p.add_argument("--filtro", default="BAURU", help="texto que o curso precisa conter (padrão: BAURU)")
+    p.add_argument("--chunksize", type=int, default=50_000, help="linhas por bloco de leitura")
+    p.add_argument("--formatos", nargs="+", choices=["csv", "parquet"], default=["csv", "parquet"])
+    p.set_defaults(func=cmd_clean)
+
+    # build-cube: nome antigo, de quando o comando também gravava o cubo
+    p = comandos.add_parser("build-parquet", aliases=["build-cube"], parents=[instrumentacao],
+                            help="pré-compila o Parquet tipado do dataset do dashboard")
+    p.add_argument("--dataset", help="CSV consolidado (padrão: ./saida/bauru.csv ou, antes da primeira "
+                                      "extração, ./saida/bauru_ampla.csv)")
+    p.set_defaults(func=cmd_build_parquet)
+
+    p = comandos.add_parser("watch", parents=[instrumentacao, cache_camelot],
+                            help="vigia a pasta de PDFs e extrai (incremental) cada PDF novo")
+    p.add_argument("--pdfs", default=pasta, help="pasta vigiada (padrão: ./pdfs)")
+    p.add_argument("--saida", default=saida, help="pasta de saída (padrão: ./saida)")
+    p.add_argument("--campus", default="bauru", help="campus dos CSVs bauru_*.csv (padrão: bauru)")
+    p.add_argument("--intervalo", type=float, default=5.0, help="segundos entre as varreduras (padrão: 5)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processos para o camelot")
+    p.add_argument("--formatos", nargs="+", choices=["csv", "parquet"], default=["csv", "parquet"])
+    p.set_defaults(func=cmd_watch)
+
+    p = comandos.add_parser("serve", help="abre o dashboard (streamlit)")
+    p.add_argument("--dataset", help="CSV consolidado (padrão: ./saida/bauru.csv ou, antes da primeira "
+                                      "extração, ./saida/bauru_ampla.csv)")
+    p.add_argument("--porta", type=int, default=8501)
+    p.add_argument("--headless", action="store_true", help="não abre o navegador (servidores)")
+    p.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = _parser().parse_args(argv)
+    return args.func(args)
+
+
+# O guard é obrigatório com workers > 1: no Windows os processos do pool
+# reimportam este arquivo e, sem ele, disparariam a extração de novo.
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+from esquema import COLS, COLUNAS_CONTAGEM, coagir_contagens, corrigir_texto
+from paginas import normalizar_texto
+
+
+# Versão do mapeamento abaixo: entra na assinatura dos checkpoints do
+# extrator, que guardam as tabelas já normalizadas.
+VERSAO_NORMALIZACAO = "1"
+
+# Colunas de uma tabela da Vunesp já normalizada, na ordem do dataset do dashboard
+COLUNAS_TABELA = [COLS[c] for c in ("curso", "vagas", "conv", "le", "rel_ad", "vagas_rem", "mat_m", "mat_f",
+                                    "mat_total")]
+
+# O camelot devolve o cabeçalho quebrado em várias linhas, ex.:
+#   CURSO | VAGAS | CHAMADA |      |         | SEXO  |      |
+#         |       |         |      | RELAÇÃO |       |      |
+#         |       | Conv.   | L.E. | ADIC.   | Masc. | Fem. | TOTAL
+# Os rótulos de cada coluna são empilhados ("chamada conv.") e o primeiro
+# termo abaixo contido neles dá a coluna. A ordem importa: "vagas rem."
+# precisa cair em vagas_rem antes de cair em vagas.
+ROTULOS = [
+    ("curso", COLS["curso"]),
+    ("rem", COLS["vagas_rem"]),
+    ("vagas", COLS["vagas"]),
+    ("relacao", COLS["rel_ad"]),
+    ("adic", COLS["rel_ad"]),
+    ("conv", COLS["conv"]),
+    ("l.e", COLS["le"]),
+    ("masc", COLS["mat_m"]),
+    ("fem", COLS["mat_f"]),
+    ("total", COLS["mat_total"]),
+]
+
+# Páginas de continuação não repetem o cabeçalho: aí vale o layout padrão
+# para a largura da tabela (com vagas remanescentes só na ampla concorrência)
+LAYOUTS = {
+    8: [c for c in COLUNAS_TABELA if c != COLS["vagas_rem"]],
+    9: COLUNAS_TABELA,
+}
+
+# Só o topo da tabela é examinado; células mais longas que TAMANHO_ROTULO
+# ali são título de seção ou nome de curso, não rótulo de coluna
+LINHAS_CABECALHO = 12
+TAMANHO_ROTULO = 20
+RE_NUMERO = r"\s*-?\d+\s*"
+
+
+def mapear_cabecalho(tabela: pd.DataFrame) -> tuple[dict, int]:
+    """Acha o cabeçalho de várias linhas de uma tabela crua e mapeia as colunas.
+
+    O cabeçalho vai até a última linha com rótulo curto antes da primeira
+    linha com números (pelo menos dois a partir da segunda coluna); o início
+    de um nome de curso logo depois dele não entra. Devolve {coluna crua:
+    coluna de COLS} e o número de linhas de cabeçalho. Sem rótulo de curso,
+    usa LAYOUTS pela largura; largura desconhecida devolve o mapa vazio.
+    """
+    topo = tabela.head(LINHAS_CABECALHO).fillna("").astype(str)
+    dados = topo.iloc[:, 1:].apply(lambda c: c.str.fullmatch(RE_NUMERO)).sum(axis=1) >= 2
+    curtos = topo.apply(lambda c: c.str.strip().str.len().between(1, TAMANHO_ROTULO))
+    com_rotulo = np.flatnonzero(curtos.iloc[:int(dados.to_numpy().argmax()) if dados.any() else 0].any(axis=1))
+    n = int(com_rotulo[-1]) + 1 if len(com_rotulo) else 0
+
+    rotulos = topo.iloc[:n].where(curtos.iloc[:n])
+    empilhados = rotulos.stack().groupby(level=1, sort=False).agg(" ".join)
+
+    mapa = {}
+    for coluna in tabela.columns:
+        rotulo = normalizar_texto(empilhados.get(coluna, ""))
+        nome = next((nome for termo, nome in ROTULOS if termo in rotulo), None)
+        if nome is not None and nome not in mapa.values():
+            mapa[coluna] = nome
+    if COLS["curso"] not in mapa.values():
+        mapa = dict(zip(tabela.columns, LAYOUTS.get(tabela.shape[1], [])))
+    return mapa, n
+
+
+def _juntar_nomes_quebrados(df: pd.DataFrame) -> pd.DataFrame:
+    # Nome de curso comprido sai do camelot em três linhas ("início" só texto,
+    # números com o curso vazio, "fim" só texto) ou em duas ("início", números
+    # com o fim do nome). Os pedaços vão para a linha dos números e as linhas
+    # só de texto (pedaços, notas de rodapé) saem, junto com a linha TOTAL.
+    curso = df[COLS["curso"]].fillna("").astype(str)
+    numeros = df.drop(columns=COLS["curso"]).fillna("").astype(str)
+    com_numeros = numeros.apply(lambda c: c.str.fullmatch(RE_NUMERO)).any(axis=1)
+    so_texto = ~com_numeros & (curso.str.strip() != "")
+    sem_nome = com_numeros & (curso.str.strip() == "")
+
+    # o texto logo acima é início do nome, salvo se já for o fim do nome de duas linhas acima
+    inicio = com_numeros & so_texto.shift(1, fill_value=False) & ~sem_nome.shift(2, fill_value=False)
+    fim = sem_nome & so_texto.shift(-1, fill_value=False)
+    curso = curso.mask(inicio, curso.shift(1) + " " + curso)
+    curso = curso.mask(fim, curso + " " + curso.shift(-1))
+    total = df[COLS["curso"]].fillna("").astype(str).str.strip().str.upper() == "TOTAL"
+    return df.assign(**{COLS["curso"]: curso})[com_numeros & ~total]
+
+
+def aplicar_mapa(tabela: pd.DataFrame, mapa: dict) -> pd.DataFrame:
+    """Renomeia as colunas de uma tabela (já sem cabeçalho) para COLUNAS_TABELA, faltantes nulas.
+
+    Os valores continuam texto; a conversão fica para normalizar_valores,
+    feita de uma vez sobre todas as tabelas.
+    """
+    return _juntar_nomes_quebrados(tabela[list(mapa)].rename(columns=mapa).reindex(columns=COLUNAS_TABELA))
+
+
+def colapsar_cabecalho(tabela: pd.DataFrame) -> pd.DataFrame | None:
+    """Tira o cabeçalho e aplica o mapa de mapear_cabecalho; None se a tabela não for reconhecida."""
+    mapa, n = mapear_cabecalho(tabela)
+    if not mapa:
+        return None
+    return aplicar_mapa(tabela.iloc[n:], mapa)
+
+
+def linhas_completas(df: pd.DataFrame) -> pd.Series:
+    """Linhas de uma tabela crua com curso na primeira coluna e pelo menos um número nas demais."""
+    primeira = df.iloc[:, 0].fillna("").astype(str).str.strip()
+    numeros = df.iloc[:, 1:].fillna("").astype(str).apply(lambda c: c.str.fullmatch(RE_NUMERO)).any(axis=1)
+    return (primeira != "") & numeros
+
+
+def dividir_tabelas(df: pd.DataFrame) -> list[pd.DataFrame]:
+    """Separa as tabelas empilhadas num mesmo CSV cru (ex.: extracts/*_raw.csv).
+
+    Cada nova tabela começa na linha "CURSO" do cabeçalho, recuando pelas
+    linhas só de rótulos logo acima dela ("MATRÍCULAS", "VAGAS"...). Só a
+    primeira parte pode não ter cabeçalho (continuação de um bloco anterior).
+    """
+    primeira = df.iloc[:, 0].fillna("").astype(str).str.strip()
+    numeros = df.iloc[:, 1:].fillna("").astype(str).apply(lambda c: c.str.fullmatch(RE_NUMERO)).any(axis=1)
+    so_rotulos = ((primeira == "") & ~numeros).to_numpy()
+
+    inicios = []
+    for i in np.flatnonzero(primeira.str.upper() == "CURSO"):
+        while i > 0 and so_rotulos[i - 1]:
+            i -= 1
+        inicios.append(int(i))
+    inicios = sorted({0, *inicios})
+    return [df.iloc[a:b] for a, b in zip(inicios, inicios[1:] + [len(df)])]
+
+
+def normalizar_valores(df: pd.DataFrame) -> pd.DataFrame:
+    """Conserta o texto do curso e converte todas as contagens de uma vez (Int64, vazio = nulo)."""
+    df = df.copy()
+    df[COLS["curso"]] = corrigir_texto(df[COLS["curso"]])
+    contagens = [c for c in COLUNAS_CONTAGEM if c in df.columns]
+    df[contagens] = coagir_contagens(df[contagens])
+    return df
@@ -0,0 +1,88 @@
+import os
+import re
+import unicodedata
+
+import pypdfium2 as pdfium
+
+
+# Cabeçalho das tabelas do relatório da Vunesp, ex.:
+#   "TABELA 11"                                         -> ampla
+#   "TABELA 11 - Convênio com a SE"                     -> se
+#   "TABELA 11 - Isentos socioeconomicamente carentes*" -> isento
+RE_CABECALHO = re.compile(r"^[ \t]*TABELA[ \t]+(\d+)([^\r\n]*)", re.MULTILINE)
+
+# Ano de quatro dígitos solto (não parte de um número maior), ex.: "2015-45-56.pdf"
+RE_ANO = re.compile(r"(?<!\d)((?:19|20)\d{2})(?!\d)")
+
+
+def normalizar_texto(texto: str) -> str:
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii").lower()
+
+
+def categoria_do_cabecalho(sufixo: str) -> str:
+    sufixo = normalizar_texto(sufixo)
+    if "convenio" in sufixo:
+        return "se"
+    if "isento" in sufixo:
+        return "isento"
+    return "ampla"
+
+
+def indexar_paginas(caminho: str) -> list[dict]:
+    """Varre só a camada de texto do PDF (milissegundos, sem camelot).
+
+    Para cada página devolve o número (1-based), a categoria da tabela e o
+    texto em minúsculas sem acento, usado para achar os campi. Páginas de
+    continuação não repetem o cabeçalho e herdam a categoria da anterior.
+    """
+    documento = pdfium.PdfDocument(caminho)
+    try:
+        indice = []
+        categoria = None
+        for n in range(len(documento)):
+            pagina = documento[n]
+            textpage = pagina.get_textpage()
+            texto = textpage.get_text_range()
+            textpage.close()
+            pagina.close()
+
+            cabecalho = RE_CABECALHO.search(texto)
+            if cabecalho is not None:
+                categoria = categoria_do_cabecalho(cabecalho.group(2))
+            indice.append({"pagina": n + 1, "categoria": categoria, "texto": normalizar_texto(texto)})
+        return indice
+    finally:
+        documento.close()
+
+
+def ano_do_pdf(caminho: str) -> int | None:
+    """Ano do relatório: do nome do arquivo ou, se ele não tiver, dos metadados.
+
+    Nos metadados só valem os campos de texto (Title, Subject, Keywords). As
+    datas de criação/modificação ficam de fora porque dizem quando o arquivo
+    foi gerado ou convertido, não de que ano é o relatório. None = sem ano.
+    """
+    achado = RE_ANO.search(os.path.basename(caminho))
+    if achado is not None:
+        return int(achado.group(1))
+
+    documento = pdfium.PdfDocument(caminho)
+    try:
+        metadados = documento.get_metadata_dict()
+    finally:
+        documento.close()
+    for campo in ("Title", "Subject", "Keywords"):
+        achado = RE_ANO.search(metadados.get(campo) or "")
+        if achado is not None:
+            return int(achado.group(1))
+    return None
+
+
+def paginas_de_tabela(indice: list[dict]) -> list[int]:
+    return [p["pagina"] for p in indice if p["categoria"] is not None]
+
+
+def paginas_com(indice: list[dict], termo: str) -> list[int]:
+    """Páginas que têm tabela e mencionam o termo (ex.: o campus alvo)."""
+    termo = normalizar_texto(termo)
+    return [p["pagina"] for p in indice if p["categoria"] is not None and termo in p["texto"]]
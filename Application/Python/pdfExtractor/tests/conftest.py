@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# os módulos do projeto ficam na pasta pdfExtractor, como no app/app.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
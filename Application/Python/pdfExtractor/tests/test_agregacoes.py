@@ -0,0 +1,34 @@
+import pandas as pd
+
+from agregacoes import agg_por_ano, agg_sexo_por_ano, agg_tipo_por_ano
+from esquema import COLS, compactar
+
+
+def linhas_compactas(n: int = 20, masc: int = 1000, fem: int = 1000) -> pd.DataFrame:
+    # n cursos de um mesmo ano: cada linha cabe em int16, a soma do ano não
+    return compactar(pd.DataFrame({
+        COLS["curso"]: [f"Curso {i} - Bauru" for i in range(n)],
+        COLS["ano"]: [2024] * n,
+        COLS["tipo"]: ["Ampla Concorrência"] * n,
+        COLS["mat_m"]: [masc] * n,
+        COLS["mat_f"]: [fem] * n,
+        COLS["mat_total"]: [masc + fem] * n,
+    }))
+
+
+def test_agregados_saem_em_int64():
+    df = linhas_compactas()
+    assert df[COLS["mat_m"]].dtype == "int16"
+
+    assert agg_por_ano(df)["matriculas"].dtype == "int64"
+    assert agg_tipo_por_ano(df, False)["matriculas"].dtype == "int64"
+    sexo = agg_sexo_por_ano(df, False)
+    assert sexo[["M", "F"]].dtypes.tolist() == ["int64", "int64"]
+    assert sexo[["M", "F"]].iloc[0].tolist() == [20_000, 20_000]
+
+
+def test_percentual_por_sexo_sem_estouro():
+    # M + F = 40.000 estoura int16: sem alargar, o total vira negativo e as
+    # participações saíam 0
+    sexo = agg_sexo_por_ano(linhas_compactas(), True)
+    assert sexo[["M", "F"]].iloc[0].tolist() == [0.5, 0.5]
@@ -0,0 +1,78 @@
+import json
+
+import pandas as pd
+
+from esquema import COLS
+from extractor import PASTA_VALIDACAO, _mesclar, _validar_campi
+from validacao import ARQUIVO_QUARENTENA, ARQUIVO_RELATORIO
+
+
+def saida(*linhas: tuple[str, str]) -> pd.DataFrame:
+    return pd.DataFrame(linhas, columns=["curso", "arquivo_origem"])
+
+
+ORDEM = ["2022.pdf", "2023.pdf", "2024.pdf"]
+
+
+def test_pdf_reextraido_substitui_as_linhas_antigas():
+    existente = saida(("A", "2022.pdf"), ("B", "2023.pdf"), ("C", "2023.pdf"))
+    novos = [saida(("B novo", "2023.pdf"))]
+    df = _mesclar(existente, novos, {"2023.pdf"}, ORDEM)
+
+    assert df.values.tolist() == [["A", "2022.pdf"], ["B novo", "2023.pdf"]]
+
+
+def test_pdf_novo_entra_na_ordem_dos_arquivos():
+    # o resultado sai igual ao de uma reconstrução completa
+    existente = saida(("A", "2022.pdf"), ("C", "2024.pdf"))
+    novos = [saida(("B", "2023.pdf"), ("B2", "2023.pdf"))]
+    df = _mesclar(existente, novos, {"2023.pdf"}, ORDEM)
+
+    assert df["curso"].tolist() == ["A", "B", "B2", "C"]
+    assert df.index.tolist() == [0, 1, 2, 3]
+
+
+def test_sem_saida_existente():
+    df = _mesclar(None, [saida(("C", "2024.pdf")), saida(("A", "2022.pdf"))], {"2022.pdf", "2024.pdf"}, ORDEM)
+    assert df["curso"].tolist() == ["A", "C"]
+
+
+def test_arquivo_fora_da_ordem_vai_para_o_fim():
+    # ex.: linhas de um PDF que saiu da pasta continuam, depois das demais
+    existente = saida(("X", "removido.pdf"), ("A", "2022.pdf"))
+    df = _mesclar(existente, [saida(("C", "2024.pdf"))], {"2024.pdf"}, ORDEM)
+
+    assert df["curso"].tolist() == ["A", "C", "X"]
+
+
+def test_validar_campi_barra_por_campus_antes_das_particoes(tmp_path):
+    def linha(curso, campus, masc=20):
+        return {COLS["curso"]: curso, COLS["ano"]: 2024, COLS["tipo"]: "ampla", COLS["mat_total"]: 40,
+                COLS["mat_m"]: masc, COLS["mat_f"]: 20, COLS["conv"]: 40, "campus": campus}
+
+    df = pd.DataFrame([
+        linha("Física - noturno - Bauru", "bauru"),
+        linha("Física - noturno - Bauru", "bauru"),          # duplicado
+        linha("Direito - noturno - Franca", "franca", masc=30),  # sexo não fecha
+        linha("História - noturno - Franca", "franca"),
+    ])
+    validas = _validar_campi(df, str(tmp_path), 2024)
+
+    assert validas[COLS["curso"]].tolist() == ["História - noturno - Franca"]
+    pasta = tmp_path / PASTA_VALIDACAO / "ano=2024"
+    quarentena = pd.read_csv(pasta / ARQUIVO_QUARENTENA)
+    assert quarentena[["campus", "motivos"]].values.tolist() == [
+        ["bauru", "duplicado"], ["bauru", "duplicado"], ["franca", "sexo"],
+    ]
+    relatorio = json.loads((pasta / ARQUIVO_RELATORIO).read_text(encoding="utf-8"))
+    assert (relatorio["linhas"], relatorio["quarentena"]) == (4, 3)
+    assert {campus: r["quarentena"] for campus, r in relatorio["campi"].items()} == {"bauru": 2, "franca": 1}
+
+
+def test_validar_campi_sem_linhas_limpa_a_quarentena_do_ano(tmp_path):
+    pasta = tmp_path / PASTA_VALIDACAO / "ano=2024"
+    pasta.mkdir(parents=True)
+    (pasta / ARQUIVO_QUARENTENA).write_text("curso,motivos\nX,sexo\n", encoding="utf-8")
+
+    assert _validar_campi(pd.DataFrame(), str(tmp_path), 2024).empty
+    assert not (pasta / ARQUIVO_QUARENTENA).exists()
@@ -0,0 +1,108 @@
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from cleaning import limpar_extracts
+from esquema import COLS
+from normalizacao import COLUNAS_TABELA, colapsar_cabecalho, mapear_cabecalho, normalizar_valores
+
+# Tabelas cruas do camelot recortadas dos PDFs da Vunesp (colunas 0, 1, ...)
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def ler_tabela(nome: str) -> pd.DataFrame:
+    tabela = pd.read_csv(FIXTURES / f"{nome}.csv", dtype=str, keep_default_na=False)
+    tabela.columns = range(tabela.shape[1])
+    return tabela
+
+
+def normalizar(nome: str) -> pd.DataFrame:
+    return normalizar_valores(colapsar_cabecalho(ler_tabela(nome))).reset_index(drop=True)
+
+
+def contagens(linha: pd.Series) -> list:
+    return [None if pd.isna(v) else int(v) for v in linha[COLUNAS_TABELA[1:]]]
+
+
+def test_cabecalho_em_varias_linhas():
+    mapa, n = mapear_cabecalho(ler_tabela("cabecalho_multilinha"))
+
+    assert n == 6
+    assert list(mapa.values()) == COLUNAS_TABELA
+
+
+def test_nome_quebrado_em_tres_linhas():
+    df = normalizar("cabecalho_multilinha")
+
+    assert df[COLS["curso"]].tolist() == [
+        "Ciências Biológicas - Bacharelado: Gerenciamento Costeiro ou Biologia Marinha - integral - Litoral Paulista",
+        "Ciências Biológicas (Bac) - Vespertino/Noturno e Licenciatura - noturno - Ilha Solteira",
+        "Ciências Biológicas (Bac/Lic) - integral - Assis",
+        "Ciências Biológicas (Bac/Lic) - integral - Bauru",
+    ]
+    assert contagens(df.iloc[0]) == [40, 27, 8, 5, 0, 13, 27, 40]
+    assert contagens(df.iloc[1]) == [50, 42, 5, 3, 0, 16, 34, 50]
+
+
+def test_nome_quebrado_em_duas_linhas():
+    df = normalizar("nome_duas_linhas")
+
+    assert df[COLS["curso"]].tolist() == [
+        "Ciências Biológicas (Bac) - Vespertino/Noturno e Licenciatura - noturno - Ilha Solteira",
+        "Ciências Biológicas (Bac/Lic) - integral - Assis",
+    ]
+    assert contagens(df.iloc[0]) == [50, 42, 5, 3, 0, 16, 34, 50]
+    assert contagens(df.iloc[1]) == [40, 24, 9, 15, -8, 22, 26, 48]
+
+
+def test_continuacao_sem_cabecalho_usa_layout_da_largura():
+    tabela = ler_tabela("continuacao_sem_cabecalho")
+    mapa, n = mapear_cabecalho(tabela)
+    df = normalizar("continuacao_sem_cabecalho")
+
+    assert n == 0
+    assert COLS["vagas_rem"] not in mapa.values()
+    assert len(df) == len(tabela)
+    assert df[COLS["curso"]].iloc[2] == "Pedagogia (Lic) - noturno - Bauru"
+    assert contagens(df.iloc[2]) == [40, 5, 0, 0, None, 0, 5, 5]
+
+
+def test_tabela_sem_cabecalho_de_largura_desconhecida_fica_de_fora():
+    tabela = ler_tabela("continuacao_sem_cabecalho").iloc[:, :6]
+
+    assert colapsar_cabecalho(tabela) is None
+
+
+@pytest.fixture
+def extract_cru(tmp_path):
+    # duas tabelas empilhadas; a segunda tem o cabeçalho deslocado pelo camelot (Fem. na coluna 8)
+    entrada = tmp_path / "extracts"
+    entrada.mkdir()
+    shutil.copy(FIXTURES / "Exatas_regular_raw.csv", entrada)
+    return entrada
+
+
+def limpar(entrada: Path, saida: Path, chunksize: int) -> pd.DataFrame:
+    limpar_extracts(str(entrada), str(saida), filtro="", chunksize=chunksize, formatos=("csv",))
+    return pd.read_csv(saida)
+
+
+def test_extract_cru_com_tabelas_empilhadas(extract_cru, tmp_path):
+    df = limpar(extract_cru, tmp_path / "saida.csv", chunksize=1000)
+
+    assert len(df) == 9
+    assert (df["total"] == df["masc"] + df["fem"]).all()
+    tupa = df[df["curso"] == "Administração - Bacharelado - integral - Tupã"].iloc[0]
+    assert tupa[["vagas", "convocados", "vagas_reman", "masc", "fem", "total"]].tolist() == [40, 11, 7, 24, 9, 33]
+    assert set(df["metodo_ingresso"]) == {"regular"} and set(df["area"]) == {"Exatas"}
+
+
+def test_recorte_em_blocos_nao_muda_o_resultado(extract_cru, tmp_path):
+    # chunksize 1 a 23: o corte cai em todas as posições, inclusive no meio
+    # dos dois cabeçalhos e entre as linhas de rodapé
+    inteiro = limpar(extract_cru, tmp_path / "inteiro.csv", chunksize=1000)
+    linhas = len(pd.read_csv(extract_cru / "Exatas_regular_raw.csv"))
+    for chunksize in range(1, linhas):
+        pd.testing.assert_frame_equal(limpar(extract_cru, tmp_path / f"blocos_{chunksize}.csv", chunksize), inteiro)
@@ -0,0 +1,67 @@
+import pandas as pd
+
+from esquema import COLS
+from validacao import FOLGA_CHAMADA, validar
+
+
+def linha(curso="Física - noturno - Bauru", ano=2024, tipo="Ampla Concorrência", total=40, masc=20, fem=20,
+          conv=35, le=4, rel_ad=1) -> dict:
+    return {
+        COLS["curso"]: curso, COLS["ano"]: ano, COLS["tipo"]: tipo,
+        COLS["mat_total"]: total, COLS["mat_m"]: masc, COLS["mat_f"]: fem,
+        COLS["conv"]: conv, COLS["le"]: le, COLS["rel_ad"]: rel_ad,
+    }
+
+
+def test_linhas_consistentes_passam():
+    df = pd.DataFrame([linha(), linha(ano=2023)])
+    validas, quarentena, relatorio = validar(df)
+
+    assert len(validas) == 2 and quarentena.empty
+    assert relatorio == {"linhas": 2, "validas": 2, "quarentena": 0,
+                         "checagens": {"sexo": 0, "chamada": 0, "duplicado": 0}, "chamada_tolerada": 0}
+
+
+def test_sexo_e_chamada_barram_com_os_motivos():
+    df = pd.DataFrame([
+        linha(curso="A - Bauru", masc=25),                   # 25 + 20 != 40
+        linha(curso="B - Bauru", conv=40),                   # chamadas somam 45 > 40
+        linha(curso="C - Bauru", masc=25, conv=40),
+        linha(curso="D - Bauru"),
+    ])
+    validas, quarentena, relatorio = validar(df)
+
+    assert validas[COLS["curso"]].tolist() == ["D - Bauru"]
+    assert dict(zip(quarentena[COLS["curso"]], quarentena["motivos"])) == {
+        "A - Bauru": "sexo", "B - Bauru": "chamada", "C - Bauru": "sexo;chamada",
+    }
+    assert relatorio["checagens"] == {"sexo": 2, "chamada": 2, "duplicado": 0}
+
+
+def test_chamada_abaixo_do_total_dentro_da_folga_fica():
+    # 40 matriculados e 40 - FOLGA_CHAMADA nas chamadas: diferença do PDF, só registrada
+    dentro = linha(curso="A - Bauru", conv=35 - FOLGA_CHAMADA)
+    fora = linha(curso="B - Bauru", conv=20)
+    validas, quarentena, relatorio = validar(pd.DataFrame([dentro, fora]))
+
+    assert validas[COLS["curso"]].tolist() == ["A - Bauru"]
+    assert quarentena["motivos"].tolist() == ["chamada"]
+    assert relatorio["chamada_tolerada"] == 1
+
+
+def test_duplicados_saem_todas_as_copias():
+    # no modo incremental as saídas antigas chegam como texto: "2024" e 2024 são o mesmo ano
+    df = pd.DataFrame([linha(), linha(), linha(tipo="Isentos")])
+    df[COLS["ano"]] = pd.Series(["2024", 2024, 2024], dtype=object)
+    validas, quarentena, relatorio = validar(df)
+
+    assert validas[COLS["tipo"]].tolist() == ["Isentos"]
+    assert quarentena["motivos"].tolist() == ["duplicado", "duplicado"]
+    assert relatorio["checagens"]["duplicado"] == 2
+
+
+def test_contagem_vazia_vale_zero():
+    # como nos CSVs lidos como texto: célula vazia em L.E. e relação adicional
+    validas, quarentena, _ = validar(pd.DataFrame([linha(conv=40, le="", rel_ad="")]))
+
+    assert len(validas) == 1 and quarentena.empty
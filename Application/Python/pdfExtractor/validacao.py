@@ -0,0 +1,96 @@
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from esquema import COLS, coagir_contagens, gravacao_atomica
+
+
+# Dentro de pasta_saida, com "_" inicial como o manifesto de falhas: linhas
+# barradas pela validação (com o motivo) e o relatório da última execução
+ARQUIVO_QUARENTENA = "_quarentena.csv"
+ARQUIVO_RELATORIO = "_validacao.json"
+
+# Nas tabelas da Vunesp o total de matriculados pode passar um pouco da soma
+# das chamadas (conv. + L.E. + relação adicional): em 2018, por exemplo, há
+# cursos com 40 matriculados e 38 nas chamadas. Essa diferença é do próprio
+# PDF e fica só no relatório; só vai para a quarentena a soma maior que o
+# total ou abaixo dele mais que max(FOLGA_CHAMADA, TOLERANCIA_CHAMADA do total),
+# o que em geral é coluna trocada pelo camelot.
+FOLGA_CHAMADA = 3
+TOLERANCIA_CHAMADA = 0.10
+
+
+def validar(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, dict]:
+    """Confere as linhas do dataset de uma vez e separa as inconsistentes.
+
+    Checagens (todas vetorizadas sobre o frame inteiro, contagem vazia = 0):
+    - sexo: matriculados_total == masc + fem;
+    - chamada: conv + L.E. + relação adicional fecha com o total, dentro da
+      folga descrita em TOLERANCIA_CHAMADA;
+    - duplicado: (curso, ano, tipo) aparece mais de uma vez; todas as cópias
+      saem, já que não dá para saber qual é a certa.
+
+    Devolve (válidas, quarentena, relatório). A quarentena traz as colunas
+    originais mais "motivos" (ex.: "sexo;chamada").
+    """
+    contagens = [COLS["mat_total"], COLS["mat_m"], COLS["mat_f"], COLS["conv"], COLS["le"], COLS["rel_ad"]]
+    valores = coagir_contagens(df.reindex(columns=contagens)).fillna(0).to_numpy(dtype="int64")
+    total, masc, fem, conv, le, rel_ad = valores.T
+
+    diferenca = total - (conv + le + rel_ad)
+    limite = np.maximum(FOLGA_CHAMADA, np.ceil(TOLERANCIA_CHAMADA * total))
+    # um curso tem uma linha por ano e tipo; o ano vira número porque no modo
+    # incremental as saídas antigas chegam como texto e as novas como Int64
+    chave = pd.DataFrame({
+        COLS["curso"]: df[COLS["curso"]].astype(str).to_numpy(),
+        COLS["ano"]: pd.to_numeric(df[COLS["ano"]], errors="coerce").to_numpy(),
+        COLS["tipo"]: df[COLS["tipo"]].astype(str).to_numpy(),
+    })
+    checagens = {
+        "sexo": total != masc + fem,
+        "chamada": (diferenca < 0) | (diferenca > limite),
+        "duplicado": chave.duplicated(keep=False).to_numpy(),
+    }
+
+    barradas = np.logical_or.reduce(list(checagens.values()))
+    # o texto dos motivos só é montado para as linhas barradas
+    motivos = np.full(int(barradas.sum()), "", dtype=object)
+    for nome, falhou in checagens.items():
+        motivos = motivos + np.where(falhou[barradas], nome + ";", "")
+
+    quarentena = df[barradas].assign(motivos=[m.rstrip(";") for m in motivos])
+    relatorio = {
+        "linhas": len(df),
+        "validas": int((~barradas).sum()),
+        "quarentena": int(barradas.sum()),
+        "checagens": {nome: int(falhou.sum()) for nome, falhou in checagens.items()},
+        # diferenças dentro da folga: ficam no dataset, só registradas aqui
+        "chamada_tolerada": int(((diferenca != 0) & ~checagens["chamada"]).sum()),
+    }
+    return df[~barradas], quarentena, relatorio
+
+
+def ler_quarentena(caminho: str) -> pd.DataFrame | None:
+    """Quarentena de uma execução anterior (texto, como os CSVs no modo incremental), sem a coluna motivos."""
+    if not os.path.exists(caminho):
+        return None
+    return pd.read_csv(caminho, dtype=str, keep_default_na=False).drop(columns="motivos")
+
+
+def gravar_validacao(pasta: str, quarentena: pd.DataFrame, relatorio: dict) -> None:
+    """Grava o relatório e a quarentena em pasta; sem linhas barradas, remove a quarentena anterior."""
+    caminho = os.path.join(pasta, ARQUIVO_QUARENTENA)
+    if quarentena.empty:
+        if os.path.exists(caminho):
+            os.remove(caminho)
+    else:
+        with gravacao_atomica(caminho) as temporario:
+            quarentena.to_csv(temporario, index=False)
+
+    with gravacao_atomica(os.path.join(pasta, ARQUIVO_RELATORIO)) as temporario:
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"data": datetime.now().isoformat(timespec="seconds"), **relatorio}, f,
+                      ensure_ascii=False, indent=2)
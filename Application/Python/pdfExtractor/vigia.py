@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+
+from cache_pdf import CacheTabelas
+from instrumentacao import evento
+
+
+# Modo "vigia": fica observando a pasta de PDFs e roda a extração incremental
+# quando chega um PDF novo (ou um existente é substituído). A varredura é por
+# polling (tamanho + mtime), sem dependência extra e funcionando também em
+# pastas de rede, onde notificações do sistema de arquivos não chegam.
+
+
+def _instantaneo(pasta: str) -> dict[str, tuple[int, float]]:
+    estado = {}
+    for entrada in os.scandir(pasta):
+        if entrada.is_file() and entrada.name.lower().endswith(".pdf"):
+            info = entrada.stat()
+            estado[entrada.name] = (info.st_size, info.st_mtime)
+    return estado
+
+
+async def vigiar(pasta_pdf: str, pasta_saida: str = "./saida", campus_alvo: str = "bauru", intervalo: float = 5.0,
+                 workers: int = 1, cache: CacheTabelas | None = None, formatos: tuple[str, ...] = ("csv", "parquet"),
+                 parar: asyncio.Event | None = None) -> None:
+    """Processa os PDFs de pasta_pdf conforme eles chegam, até parar ser acionado.
+
+    - Na partida, uma passada incremental põe as saídas em dia com o que já
+      está na pasta.
+    - A cada intervalo, um PDF novo ou alterado só entra quando o tamanho e
+      o mtime se repetem em duas varreduras seguidas (cópia terminada).
+    - Os PDFs prontos vão para uma fila. Um único consumidor junta tudo o que
+      estiver nela num lote e chama extrair_bauru_em_csvs (incremental, com
+      os alterados em reprocessar) numa thread. O paralelismo fica limitado
+      aos workers processos do camelot, e nunca há duas extrações gravando
+      as mesmas saídas. A varredura continua enquanto o lote roda. Os
+      processos nascem por "spawn": um fork feito de dentro da thread
+      herdaria travas (ex.: a do logging) presas por outra thread.
+    - As saídas, inclusive o bauru.csv com as três categorias que o
+      dashboard lê, são trocadas com os.replace: quem lê vê a versão
+      anterior ou a nova, nunca um arquivo pela metade.
+    """
+    from extractor import extrair_bauru_em_csvs
+
+    parar = parar or asyncio.Event()
+    fila: asyncio.Queue[set[str]] = asyncio.Queue()
+
+    async def varrer():
+        processados = _instantaneo(pasta_pdf)
+        anterior = processados
+        await fila.put(set())  # passada inicial
+        while not parar.is_set():
+            try:
+                await asyncio.wait_for(parar.wait(), timeout=intervalo)
+            except asyncio.TimeoutError:
+                pass
+            atual = await asyncio.to_thread(_instantaneo, pasta_pdf)
+            prontos = {arquivo for arquivo, assinatura in atual.items()
+                       if anterior.get(arquivo) == assinatura and processados.get(arquivo) != assinatura}
+            anterior = atual
+            if prontos:
+                processados.update({arquivo: atual[arquivo] for arquivo in prontos})
+                evento("vigia_novos", f"👀 PDFs prontos para extração: {', '.join(sorted(prontos))}", logging.INFO,
+                       arquivos=sorted(prontos))
+                await fila.put(prontos)
+
+    async def processar():
+        while True:
+            lote = await fila.get()
+            juntados = 1
+            while not fila.empty():
+                lote |= fila.get_nowait()
+                juntados += 1
+            try:
+                await asyncio.to_thread(extrair_bauru_em_csvs, pasta_pdf, campus_alvo=campus_alvo,
+                                        pasta_saida=pasta_saida, workers=workers, cache=cache, incremental=True,
+                                        reprocessar=sorted(lote), formatos=formatos, retomar=True,
+                                        mp_context=multiprocessing.get_context("spawn"))
+            except Exception as e:
+                # o vigia continua: o próximo lote (ou a próxima partida) tenta de novo
+                evento("vigia_erro", f"Erro na extração do lote {sorted(lote)}: {e}", logging.ERROR,
+                       arquivos=sorted(lote), erro=repr(e))
+            finally:
+                for _ in range(juntados):
+                    fila.task_done()
+
+    evento("vigia", f"👀 Vigiando {pasta_pdf} a cada {intervalo:g}s (Ctrl+C para sair)", logging.INFO,
+           pasta=pasta_pdf, intervalo=intervalo)
+    consumidor = asyncio.create_task(processar())
+    try:
+        await varrer()
+        # parar acionado: termina o lote em andamento e o que já estava na fila
+        await fila.join()
+    finally:
+        consumidor.cancel()